@@ -14,7 +14,7 @@ from oteapi.models import AttrDict, FunctionConfig
 from pydantic import Field
 from pydantic.dataclasses import dataclass
 
-from oteapi_dlite.models import DLiteResult
+from oteapi_dlite.models import DLiteConfiguration, DLiteResult
 from oteapi_dlite.utils import get_collection, update_collection
 
 
@@ -61,7 +61,7 @@ class DLiteConvertOutputConfig(AttrDict):
     ] = None
 
 
-class DLiteConvertStrategyConfig(DLiteResult):
+class DLiteConvertStrategyConfig(DLiteConfiguration):
     """Configuration for generic DLite converter."""
 
     function_name: Annotated[
@@ -148,7 +148,8 @@ class DLiteConvertStrategy:
         """Initialize."""
         return DLiteResult(
             collection_id=get_collection(
-                self.function_config.configuration.collection_id
+                self.function_config.configuration.collection_id,
+                self.function_config.configuration.dlite_settings,
             ).uuid
         )
 
@@ -166,7 +167,7 @@ class DLiteConvertStrategy:
         function = getattr(module, config.function_name)
         kwargs = config.kwargs or {}
 
-        coll = get_collection(config.collection_id)
+        coll = get_collection(config.collection_id, config.dlite_settings)
 
         instances = []
         for i, input_config in enumerate(config.inputs):
@@ -197,5 +198,5 @@ class DLiteConvertStrategy:
             coll.add(output_config.label, inst)
             inst._incref()
 
-        update_collection(coll)
+        update_collection(coll, dlite_settings=config.dlite_settings)
         return DLiteResult(collection_id=coll.uuid)
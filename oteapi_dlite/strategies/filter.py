@@ -3,18 +3,28 @@
 from __future__ import annotations
 
 import re
-from typing import Annotated
+import time
+from typing import TYPE_CHECKING, Annotated
 
-from dlite.utils import get_referred_instances
-from oteapi.models import FilterConfig
+import dlite
+from oteapi.models import AttrDict, FilterConfig
 from pydantic import Field
 from pydantic.dataclasses import dataclass
 
-from oteapi_dlite.models import DLiteResult
-from oteapi_dlite.utils import get_collection, update_collection
+from oteapi_dlite.models import DLiteConfiguration, DLiteResult
+from oteapi_dlite.utils import (
+    get_collection,
+    get_instance_index,
+    update_collection,
+)
 
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Iterable
 
-class DLiteQueryConfig(DLiteResult):
+    Patterns = str | list[str] | None
+
+
+class DLiteQueryConfig(DLiteConfiguration):
     """Configuration for the DLite filter strategy.
 
     First the `remove_label` and `remove_datamodel` configurations are
@@ -30,20 +40,24 @@ class DLiteQueryConfig(DLiteResult):
 
     Finally, the instances that are still marked for removal are removed
     from the collection.
+
+    All the regular expression configurations may also be given as a list
+    of regular expressions.  A label or datamodel URI matches if it
+    matches any of them.
     """
 
     remove_label: Annotated[
-        str | None,
+        str | list[str] | None,
         Field(description="Regular expression matching labels to remove."),
     ] = None
     remove_datamodel: Annotated[
-        str | None,
+        str | list[str] | None,
         Field(
             description="Regular expression matching datamodel URIs to remove.",
         ),
     ] = None
     keep_label: Annotated[
-        str | None,
+        str | list[str] | None,
         Field(
             description=(
                 "Regular expression matching labels to keep. This "
@@ -55,7 +69,7 @@ class DLiteQueryConfig(DLiteResult):
         ),
     ] = None
     keep_datamodel: Annotated[
-        str | None,
+        str | list[str] | None,
         Field(
             description=(
                 "Regular expression matching datamodel URIs to keep in "
@@ -74,6 +88,27 @@ class DLiteQueryConfig(DLiteResult):
             ),
         ),
     ] = True
+    dry_run: Annotated[
+        bool,
+        Field(
+            description=(
+                "Whether to only compute the labels that would be removed, "
+                "without modifying or storing the collection.  The labels "
+                "are returned in `removed_labels` together with the "
+                "filter statistics."
+            ),
+        ),
+    ] = False
+    statistics: Annotated[
+        bool,
+        Field(
+            description=(
+                "Whether to return statistics about the filtering, like the "
+                "number of instances kept by each rule and the time spent "
+                "in each phase."
+            ),
+        ),
+    ] = False
 
 
 class DLiteFilterConfig(FilterConfig):
@@ -85,6 +120,77 @@ class DLiteFilterConfig(FilterConfig):
     ]
 
 
+class DLiteFilterStatistics(AttrDict):
+    """Statistics about the filtering of a collection."""
+
+    scanned: Annotated[
+        int, Field(description="Number of instances in the collection.")
+    ] = 0
+    marked: Annotated[
+        int,
+        Field(
+            description=(
+                "Number of instances marked for removal by `remove_label` "
+                "and `remove_datamodel`."
+            ),
+        ),
+    ] = 0
+    kept_by_datamodel: Annotated[
+        int,
+        Field(
+            description="Number of marked instances kept by `keep_datamodel`.",
+        ),
+    ] = 0
+    kept_by_label: Annotated[
+        int,
+        Field(
+            description=(
+                "Number of marked instances kept by `keep_label` and not "
+                "already kept by `keep_datamodel`."
+            ),
+        ),
+    ] = 0
+    kept_by_referrer: Annotated[
+        int,
+        Field(
+            description=(
+                "Number of marked instances kept by `keep_referred` and not "
+                "already kept by `keep_datamodel` or `keep_label`."
+            ),
+        ),
+    ] = 0
+    referred_closure: Annotated[
+        int,
+        Field(
+            description=(
+                "Number of instances in the collection directly or "
+                "indirectly referred to by kept instances, including the "
+                "kept instances themselves."
+            ),
+        ),
+    ] = 0
+    removed: Annotated[
+        int, Field(description="Number of removed instances.")
+    ] = 0
+    timings: Annotated[
+        dict[str, float],
+        Field(description="Time in seconds spent in each phase."),
+    ] = {}  # noqa: RUF012
+
+
+class DLiteFilterResult(DLiteResult):
+    """Class for returning values from the DLite filter strategy."""
+
+    statistics: Annotated[
+        DLiteFilterStatistics | None,
+        Field(description="Filter statistics, if requested."),
+    ] = None
+    removed_labels: Annotated[
+        list[str] | None,
+        Field(description="Labels that would be removed in a dry run."),
+    ] = None
+
+
 @dataclass
 class DLiteFilterStrategy:
     """Filter that removes all but specified instances in the collection.
@@ -104,66 +210,220 @@ class DLiteFilterStrategy:
         """Initialize."""
         return DLiteResult(
             collection_id=get_collection(
-                self.filter_config.configuration.collection_id
+                self.filter_config.configuration.collection_id,
+                self.filter_config.configuration.dlite_settings,
             ).uuid
         )
 
-    def get(self) -> DLiteResult:
+    def get(self) -> DLiteFilterResult:
         """Execute the strategy."""
         config = self.filter_config.configuration
+        stats = DLiteFilterStatistics()
+        tic = time.perf_counter()
+
+        def lap(phase: str) -> None:
+            nonlocal tic
+            toc = time.perf_counter()
+            stats.timings[phase] = toc - tic
+            tic = toc
 
         # Alias for query configuration
         keep_label = (
             config.keep_label if config.keep_label else self.filter_config.query
         )
 
-        instdict = {}  # Map instance labels to [uuid, metaURI]
-        coll = get_collection(config.collection_id)
-        for s, _, o in coll.get_relations(p="_has-uuid"):
-            instdict[s] = [o]
-        for s, _, o in coll.get_relations(p="_has-meta"):
-            instdict[s].append(o)
-
-        removal = set()  # Labels marked for removal
-
-        # 1: remove_label, remove_datamodel
-        if config.remove_label or config.remove_datamodel:
-            for label, (_, metauri) in instdict.items():
-                if config.remove_label and re.match(config.remove_label, label):
-                    removal.add(label)
-
-                if config.remove_datamodel and re.match(
-                    config.remove_datamodel, metauri
-                ):
-                    removal.add(label)
-        else:
-            removal.update(instdict.keys())
-
-        # 2: keep_label, keep_datamodel
-        for label in set(removal):
-            if keep_label and re.match(keep_label, label):
-                removal.remove(label)
-
-            _, metauri = instdict[label]
-            if config.keep_datamodel and re.match(
-                config.keep_datamodel, metauri
-            ):
-                removal.remove(label)
+        coll = get_collection(config.collection_id, config.dlite_settings)
+        instdict = get_instance_index(coll)  # Map labels to (uuid, metaURI)
+        stats.scanned = len(instdict)
+        lap("index")
+
+        # 1-2: remove_label, remove_datamodel, keep_label, keep_datamodel
+        counts: dict[str, int] = {}
+        removal = select_removal(  # Labels marked for removal
+            instdict,
+            remove_label=config.remove_label,
+            remove_datamodel=config.remove_datamodel,
+            keep_label=keep_label,
+            keep_datamodel=config.keep_datamodel,
+            counts=counts,
+        )
+        stats.marked = counts["marked"]
+        stats.kept_by_datamodel = counts["kept_by_datamodel"]
+        stats.kept_by_label = counts["kept_by_label"]
+        lap("select")
 
         # 3: keep_referred
         if config.keep_referred:
-            labels = {uuid: label for label, (uuid, _) in instdict.items()}
             kept = set(instdict.keys()).difference(removal)
-            for label in kept:
-                removal.difference_update(
-                    labels[inst.uuid]
-                    for inst in get_referred_instances(coll.get(label))
-                    if inst.uuid in labels
-                )
+            referred = referred_labels(instdict, kept)
+            stats.referred_closure = len(referred)
+            nremoval = len(removal)
+            removal.difference_update(referred)
+            stats.kept_by_referrer = nremoval - len(removal)
+            lap("referred")
+        stats.removed = len(removal)
+
+        if config.dry_run:
+            return DLiteFilterResult(
+                collection_id=coll.uuid,
+                statistics=stats,
+                removed_labels=sorted(removal),
+            )
 
         # 4: remove from collection
         for label in removal:
             coll.remove(label)
+        lap("remove")
+
+        update_collection(coll, dlite_settings=config.dlite_settings)
+        lap("update")
+
+        return DLiteFilterResult(
+            collection_id=coll.uuid,
+            statistics=stats if config.statistics else None,
+        )
 
-        update_collection(coll)
-        return DLiteResult(collection_id=coll.uuid)
+
+def compile_patterns(patterns: Patterns) -> list[re.Pattern]:
+    """Compile a regular expression or a list of regular expressions."""
+    if patterns is None:
+        return []
+    if isinstance(patterns, str):
+        patterns = [patterns]
+    return [re.compile(pattern) for pattern in patterns]
+
+
+def match_any(patterns: Iterable[re.Pattern], string: str) -> bool:
+    """Return whether the beginning of `string` matches any of the compiled
+    regular expressions in `patterns`."""
+    return any(pattern.match(string) for pattern in patterns)
+
+
+def select_removal(
+    instdict: dict[str, tuple[str, str]],
+    remove_label: Patterns = None,
+    remove_datamodel: Patterns = None,
+    keep_label: Patterns = None,
+    keep_datamodel: Patterns = None,
+    counts: dict[str, int] | None = None,
+) -> set[str]:
+    """Return the labels marked for removal by the label and datamodel
+    configurations of the filter strategy (see `DLiteQueryConfig`).
+
+    The patterns are compiled once.  Datamodel patterns are only matched
+    once per distinct metadata URI.
+
+    Arguments:
+        instdict: Dict mapping labels to (uuid, metaURI) tuples, as
+            returned by `get_instance_index()`.
+        remove_label: Regular expression(s) matching labels to remove.
+        remove_datamodel: Regular expression(s) matching datamodel URIs
+            to remove.
+        keep_label: Regular expression(s) matching labels to keep.
+        keep_datamodel: Regular expression(s) matching datamodel URIs
+            to keep.
+        counts: If given, the number of labels marked for removal by
+            `remove_label` and `remove_datamodel` is stored in this dict
+            under the key "marked".  The number of marked labels kept by
+            `keep_datamodel` and by `keep_label` are stored under the
+            keys "kept_by_datamodel" and "kept_by_label".  Labels kept by
+            both are only counted under "kept_by_datamodel".
+
+    Returns:
+        Set of labels marked for removal.
+
+    """
+    remove_labels = compile_patterns(remove_label)
+    remove_datamodels = compile_patterns(remove_datamodel)
+    keep_labels = compile_patterns(keep_label)
+    keep_datamodels = compile_patterns(keep_datamodel)
+
+    metauris = {metauri for _, metauri in instdict.values()}
+    removed_metas = {
+        uri for uri in metauris if match_any(remove_datamodels, uri)
+    }
+    kept_metas = {uri for uri in metauris if match_any(keep_datamodels, uri)}
+
+    # 1: remove_label, remove_datamodel
+    if remove_labels or remove_datamodels:
+        removal = {
+            label
+            for label, (_, metauri) in instdict.items()
+            if metauri in removed_metas or match_any(remove_labels, label)
+        }
+    else:
+        removal = set(instdict)
+    marked = len(removal)
+
+    # 2: keep_datamodel, keep_label
+    if kept_metas:
+        removal = {
+            label for label in removal if instdict[label][1] not in kept_metas
+        }
+    nremoval = len(removal)
+    if keep_labels:
+        removal = {
+            label for label in removal if not match_any(keep_labels, label)
+        }
+
+    if counts is not None:
+        counts["marked"] = marked
+        counts["kept_by_datamodel"] = marked - nremoval
+        counts["kept_by_label"] = nremoval - len(removal)
+
+    return removal
+
+
+def referred_labels(
+    instdict: dict[str, tuple[str, str]], kept: Iterable[str]
+) -> set[str]:
+    """Return the labels in `instdict` of all instances that are directly
+    or indirectly referred to by the instances labelled `kept`.
+
+    References are followed via collections and properties of type 'ref'
+    in a single graph traversal, such that each instance is visited at
+    most once.  Only collections and instances whose metadata has
+    properties of type 'ref' are loaded.
+
+    Arguments:
+        instdict: Dict mapping labels to (uuid, metaURI) tuples, as
+            returned by `get_instance_index()`.
+        kept: Labels of the instances to start the traversal from.
+
+    Returns:
+        Set of labels of the referred instances, including `kept`.
+
+    """
+    labels = {uuid: label for label, (uuid, _) in instdict.items()}
+    has_refs: dict[str, bool] = {}  # Whether metadata has ref properties
+    visited: set[str] = set()
+    stack = [instdict[label] for label in kept]
+    while stack:
+        uuid, metauri = stack.pop()
+        if uuid in visited:
+            continue
+        visited.add(uuid)
+
+        if metauri == dlite.COLLECTION_ENTITY:
+            stack.extend(get_instance_index(dlite.get_instance(uuid)).values())
+            continue
+
+        if metauri not in has_refs:
+            meta = dlite.get_instance(metauri)
+            has_refs[metauri] = any(
+                prop.type == "ref" for prop in meta.properties["properties"]
+            )
+        if not has_refs[metauri]:
+            continue
+
+        inst = dlite.get_instance(uuid)
+        for prop in inst.meta.properties["properties"]:
+            if prop.type != "ref":
+                continue
+            value = inst[prop.name]
+            refs = value if prop.ndims else [value]
+            stack.extend(
+                (ref.uuid, ref.meta.uri) for ref in refs if ref is not None
+            )
+
+    return {labels[uuid] for uuid in visited if uuid in labels}
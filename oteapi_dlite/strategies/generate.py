@@ -4,10 +4,12 @@ from __future__ import annotations
 
 import json
 import os
+import re
 import tempfile
 from pathlib import Path
 from typing import TYPE_CHECKING, Annotated
 
+import dlite
 from oteapi.datacache import DataCache
 from oteapi.models import DataCacheConfig, FunctionConfig
 from pydantic import Field
@@ -15,17 +17,36 @@ from pydantic.dataclasses import dataclass
 
 from oteapi_dlite.models import DLiteConfiguration, DLiteResult
 from oteapi_dlite.utils import (
+    acquire_triplestore,
     get_collection,
     get_driver,
-    get_triplestore,
+    get_instance_index,
+    get_instances,
+    release_triplestore,
     update_collection,
     update_dict,
 )
+from oteapi_dlite.utils.kbcache import (
+    RESTRICTION_CACHE,
+    restriction_individuals,
+)
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Sequence
+    from typing import Any
+
+    from tripper import Triplestore
+
+    Triple = tuple[Any, Any, Any]
 
 # Constants
 hasInput = "https://w3id.org/emmo#EMMO_36e69413_8c59_4799_946c_10b05d266e22"
 hasOutput = "https://w3id.org/emmo#EMMO_c4bace1d_4db0_4cd3_87e9_18122bae2840"
 
+# Drivers for which `Instance.to_bytes()` produces the same content as
+# `Instance.save()`.  Other drivers are serialised via a temporary file.
+BYTES_DRIVERS = {"json"}
+
 
 class KBError(ValueError):
     """Invalid data in knowledge base."""
@@ -92,6 +113,48 @@ class DLiteStorageConfig(DLiteConfiguration):
             ),
         ),
     ] = None
+    labels: Annotated[
+        list[str] | None,
+        Field(
+            description=(
+                "Labels of DLite instances in the collection to serialise "
+                "to the same storage."
+            ),
+        ),
+    ] = None
+    label_pattern: Annotated[
+        str | None,
+        Field(
+            description=(
+                "Regular expression.  All DLite instances in the collection "
+                "with a label matching this pattern are serialised to the "
+                "same storage."
+            ),
+        ),
+    ] = None
+    all_instances: Annotated[
+        bool,
+        Field(
+            description=(
+                "Used together with `datamodel`.  Whether to serialise all "
+                "instances of `datamodel` to the same storage instead of "
+                "only the first one."
+            ),
+        ),
+    ] = False
+    batch_instantiation: Annotated[
+        bool,
+        Field(
+            description=(
+                "Used together with `datamodel`.  Whether to serialise all "
+                "instances of `datamodel` to the same storage.  If there "
+                "are none and `property_mappings` is true, one instance is "
+                "generated from the mappings for each group of source "
+                "instances in the collection, sharing the mapping routes.  "
+                "If false, only a single instance is serialised."
+            ),
+        ),
+    ] = False
     property_mappings: Annotated[
         bool,
         Field(
@@ -268,7 +331,8 @@ class DLiteGenerateStrategy:
         """Initialize."""
         return DLiteResult(
             collection_id=get_collection(
-                self.function_config.configuration.collection_id
+                self.function_config.configuration.collection_id,
+                self.function_config.configuration.dlite_settings,
             ).uuid
         )
 
@@ -290,17 +354,29 @@ class DLiteGenerateStrategy:
             else get_driver(mediaType=config.mediaType)
         )
 
-        coll = get_collection(config.collection_id)
+        coll = get_collection(config.collection_id, config.dlite_settings)
+        instances: list[dlite.Instance] = []
 
-        if config.label:
+        if config.labels or config.label_pattern or config.all_instances:
+            instances = self._select_instances(coll)
+            if not instances:
+                raise ValueError("No instances selected for serialisation.")
+            inst = instances[0]
+        elif config.label:
             inst = coll[config.label]
+        elif config.datamodel and config.batch_instantiation:
+            generated = self._batch_instances(coll)
+            inst = generated[0]
+            if len(generated) > 1:
+                instances = generated
         elif config.datamodel:
-            instances = coll.get_instances(
-                metaid=config.datamodel,
-                property_mappings=config.property_mappings,
-                allow_incomplete=config.allow_incomplete,
+            inst = next(
+                coll.get_instances(
+                    metaid=config.datamodel,
+                    property_mappings=config.property_mappings,
+                    allow_incomplete=config.allow_incomplete,
+                )
             )
-            inst = next(instances)
         elif config.store_collection:
             if config.store_collection_id:
                 inst = coll.copy(newid=config.store_collection_id)
@@ -313,25 +389,28 @@ class DLiteGenerateStrategy:
 
         # Save instance
         if config.location:
-            inst.save(driver, config.location, config.options)
+            if instances:
+                save_instances(
+                    instances, driver, config.location, config.options
+                )
+            else:
+                inst.save(driver, config.location, config.options)
         else:  # missing test
             if cacheconfig and cacheconfig.accessKey:
                 key = cacheconfig.accessKey
             else:  # missing test
                 key = "generate_data"
             cache = DataCache()
-            with tempfile.TemporaryDirectory() as tmpdir:
-                inst.save(driver, f"{tmpdir}/data", config.options)
-                with Path(f"{tmpdir}/data").open("rb") as f:
-                    cache.add(f.read(), key=key)
+            cache.add(
+                serialise(
+                    instances if instances else inst, driver, config.options
+                ),
+                key=key,
+            )
 
         # Store documentation of this instance in the knowledge base
         if config.kb_document_class:
 
-            # Import here to avoid hard dependencies on tripper.
-            from tripper import RDF
-            from tripper.convert import save_container
-
             kb_settings = config.dlite_settings.get("tripper.triplestore")
             if isinstance(kb_settings, str):
                 kb_settings = json.loads(kb_settings)
@@ -347,128 +426,293 @@ class DLiteGenerateStrategy:
                     isinstance(kb_settings, dict) or kb_settings is None
                 )  # nosec
 
+            ts = acquire_triplestore(
+                kb_settings=kb_settings,
+                collection_id=config.collection_id,
+            )
+            dirty = False
+            try:
+                triples, created = self._kb_triples(
+                    ts, instances if instances else [inst]
+                )
+                if triples:
+                    ts.add_triples(triples)
+                    dirty = True
+                RESTRICTION_CACHE.invalidate(ts, triples, created=created)
+            finally:
+                release_triplestore(ts, dirty=dirty)
+
+        # __TODO__
+        # Can we safely assume that all strategies in a pipeline will be
+        # executed in the same Python interpreter?  If not, we should write
+        # the collection to a storage, such that it can be shared with the
+        # other strategies.
+
+        update_collection(coll, dlite_settings=config.dlite_settings)
+        return DLiteResult(collection_id=coll.uuid)
+
+    def _kb_triples(
+        self, ts: Triplestore, instances: Sequence[dlite.Instance]
+    ) -> tuple[list[Triple], list[str]]:
+        """Return triples documenting `instances` in the knowledge base.
+
+        One individual of `kb_document_class` is documented for each
+        instance.  If `kb_document_computation` is given, a single
+        computation individual is documented with all the new individuals
+        as output.  The restrictions of the computation class are looked
+        up via a cache shared between runs.
+
+        The triples are accumulated, such that they can be added to the
+        knowledge base in a single call.
+
+        Returns:
+            The triples and the IRIs of the new individuals.
+
+        """
+        # Import here to avoid hard dependencies on tripper.
+        from tripper import DCAT, EMMO, OTEIO, RDF
+        from tripper.convert import from_container
+
+        config = self.function_config.configuration
+
+        if TYPE_CHECKING:  # pragma: no cover
+            # This block will only be run by mypy when checking typing
+            assert config.kb_document_class  # nosec
+
+        # Namespaces bound by tripper.convert.save_container()
+        for prefix, namespace in (
+            ("rdf", RDF),
+            ("dcat", DCAT),
+            ("emmo", EMMO),
+            ("oteio", OTEIO),
+        ):
+            if prefix not in ts.namespaces:
+                ts.bind(prefix, namespace)
+
+        triples: list[Triple] = []
+        iris = []
+        for inst in instances:
             # IRI of new individual
             iri = individual_iri(
                 class_iri=config.kb_document_class,
                 base_iri=config.kb_document_base_iri,
             )
+            iris.append(iri)
 
-            triples = [(iri, RDF.type, config.kb_document_class)]
+            triples.append((iri, RDF.type, config.kb_document_class))
             if config.kb_document_context:
                 for prop, val in config.kb_document_context.items():
                     triples.append((iri, prop, val))
 
-            ts = get_triplestore(
-                kb_settings=kb_settings,
-                collection_id=config.collection_id,
+            # Document data source
+            resource: dict[str, Any] = {
+                "dataresource": {
+                    "type": config.kb_document_class,
+                    "downloadUrl": config.location,
+                    "mediaType": (
+                        config.mediaType
+                        if config.mediaType
+                        else "application/vnd.dlite-parse"
+                    ),
+                    "configuration": {
+                        "datamodel": (
+                            config.datamodel
+                            if config.datamodel
+                            else inst.meta.uri
+                        ),
+                        "driver": config.driver,
+                        "options": (  # Trying to be clever here...
+                            config.options.replace("mode=w", "mode=r")
+                            if config.options
+                            else config.options
+                        ),
+                    },
+                },
+                # "parse": {},  # No supported by OTEAPI yet...
+                "mapping": {
+                    "mappingType": "mappings",
+                    # __TODO__
+                    # Populate prefixes and triples from mapping
+                    # strategy in current partial pipeline
+                    # "prefixes": {},
+                    # "triples": [],
+                },
+            }
+            if len(instances) > 1:
+                # Several instances are stored in the same storage
+                resource["dataresource"]["configuration"]["id"] = inst.uuid
+            update_dict(resource, config.kb_document_update)
+            triples.extend(
+                from_container(resource, iri, recognised_keys="basic")
             )
-            try:
-                if config.kb_document_computation:
-                    comput = individual_iri(
-                        class_iri=config.kb_document_computation,
-                        base_iri=config.kb_document_base_iri,
-                    )
-                    triples.extend(
-                        [
-                            (comput, RDF.type, config.kb_document_computation),
-                            (comput, hasOutput, iri),
-                        ]
-                    )
 
-                    # Relate computation individual `comput` to its
-                    # input individuals.
-                    #
-                    # This simple implementation works against KB.  It
-                    # assumes that the input of
-                    # `kb_document_computation` is documented in the
-                    # KB and that there only exists one individual of each
-                    # input class.
-                    #
-                    # In the case of multiple individuals of the input
-                    # classes, the workflow executer must be involded
-                    # in the documentation.  It can either do the
-                    # documentation itself or provide a callback
-                    # providing the needed info, which can be called
-                    # from this strategy.
-
-                    # Relate to input dataset individuals
-                    restrictions = ts.restrictions(
-                        config.kb_document_computation, hasInput
-                    )
-                    for r in restrictions:
-                        input_class = r["value"]
-                        indv = ts.value(predicate=RDF.type, object=input_class)
-                        triples.append((comput, r["property"], indv))
-
-                    # Add output dataset individuals
-                    restrictions = ts.restrictions(
-                        config.kb_document_computation, hasOutput
+        created = list(iris)
+        if config.kb_document_computation:
+            comput = individual_iri(
+                class_iri=config.kb_document_computation,
+                base_iri=config.kb_document_base_iri,
+            )
+            triples.append((comput, RDF.type, config.kb_document_computation))
+            triples.extend((comput, hasOutput, iri) for iri in iris)
+            created.append(comput)
+
+            # Relate computation individual `comput` to its input
+            # individuals.
+            #
+            # This simple implementation works against KB.  It assumes
+            # that the input of `kb_document_computation` is documented
+            # in the KB and that there only exists one individual of each
+            # input class.
+            #
+            # In the case of multiple individuals of the input classes,
+            # the workflow executer must be involded in the
+            # documentation.  It can either do the documentation itself
+            # or provide a callback providing the needed info, which can
+            # be called from this strategy.
+
+            # The restrictions and individuals are cached, see
+            # `oteapi_dlite.utils.kbcache`.
+
+            # Relate to input dataset individuals
+            for prop, _, indv in restriction_individuals(
+                ts, config.kb_document_computation, hasInput
+            ):
+                triples.append((comput, prop, indv))
+
+            # Add output dataset individuals
+            for prop, _, indv in restriction_individuals(
+                ts, config.kb_document_computation, hasOutput
+            ):
+                if indv and indv not in iris:
+                    triples.append((comput, prop, indv))
+
+        return triples, created
+
+    def _batch_instances(self, coll: dlite.Collection) -> list[dlite.Instance]:
+        """Return the instances of `datamodel` to serialise with
+        `batch_instantiation`.
+
+        All instances of `datamodel` in the collection are returned.  If
+        there are none and `property_mappings` is true, instances are
+        created from the property mappings with `get_instances()`, one
+        for each group of source instances.  The mapping routes are
+        found once and evaluated for all groups at once.
+
+        If the source instances cannot be grouped, because the source
+        datamodels have different numbers of instances, a single instance
+        is created from the mappings like without `batch_instantiation`.
+        """
+        config = self.function_config.configuration
+
+        instances = list(coll.get_instances(metaid=config.datamodel))
+        if instances:
+            return instances
+        if not config.property_mappings:
+            raise ValueError(
+                f"No instance of {config.datamodel} in the collection."
+            )
+        try:
+            return get_instances(
+                config.datamodel,
+                collection=coll,
+                allow_incomplete=bool(config.allow_incomplete),
+            )
+        except ValueError:
+            return [
+                next(
+                    coll.get_instances(
+                        metaid=config.datamodel,
+                        property_mappings=True,
+                        allow_incomplete=config.allow_incomplete,
                     )
-                    for r in restrictions:
-                        output_class = r["value"]
-                        indv = ts.value(
-                            predicate=RDF.type,
-                            object=output_class,
-                            default=None,
-                        )
-                        if indv and indv != iri:
-                            triples.append((comput, r["property"], indv))
-
-                # Document data source
-                resource = {
-                    "dataresource": {
-                        "type": config.kb_document_class,
-                        "downloadUrl": config.location,
-                        "mediaType": (
-                            config.mediaType
-                            if config.mediaType
-                            else "application/vnd.dlite-parse"
-                        ),
-                        "configuration": {
-                            "datamodel": (
-                                config.datamodel
-                                if config.datamodel
-                                else inst.meta.uri
-                            ),
-                            "driver": config.driver,
-                            "options": (  # Trying to be clever here...
-                                config.options.replace("mode=w", "mode=r")
-                                if config.options
-                                else config.options
-                            ),
-                        },
-                    },
-                    # "parse": {},  # No supported by OTEAPI yet...
-                    "mapping": {
-                        "mappingType": "mappings",
-                        # __TODO__
-                        # Populate prefixes and triples from mapping
-                        # strategy in current partial pipeline
-                        # "prefixes": {},
-                        # "triples": [],
-                    },
-                }
-                update_dict(resource, config.kb_document_update)
-
-                save_container(
-                    ts,
-                    resource,
-                    iri,
-                    recognised_keys="basic",
                 )
-                ts.add_triples(triples)
+            ]
 
-            finally:
-                ts.close()
+    def _select_instances(self, coll: dlite.Collection) -> list[dlite.Instance]:
+        """Return the instances selected by the `labels`, `label_pattern`
+        and `all_instances` configurations, without duplicates."""
+        config = self.function_config.configuration
 
-        # __TODO__
-        # Can we safely assume that all strategies in a pipeline will be
-        # executed in the same Python interpreter?  If not, we should write
-        # the collection to a storage, such that it can be shared with the
-        # other strategies.
+        labels = list(config.labels) if config.labels else []
+        if config.label_pattern:
+            pattern = re.compile(config.label_pattern)
+            labels.extend(
+                label
+                for label in get_instance_index(coll)
+                if pattern.match(label)
+            )
+        instances: dict[str, dlite.Instance] = {}
+        for label in labels:
+            inst = coll[label]
+            instances.setdefault(inst.uuid, inst)
 
-        update_collection(coll)
-        return DLiteResult(collection_id=coll.uuid)
+        if config.all_instances:
+            if not config.datamodel:
+                raise ValueError(
+                    "`all_instances` requires the `datamodel` configuration."
+                )
+            if config.batch_instantiation:
+                selected = self._batch_instances(coll)
+            else:
+                selected = list(
+                    coll.get_instances(
+                        metaid=config.datamodel,
+                        property_mappings=config.property_mappings,
+                        allow_incomplete=config.allow_incomplete,
+                    )
+                )
+            for inst in selected:
+                instances.setdefault(inst.uuid, inst)
+
+        return list(instances.values())
+
+
+def save_instances(
+    instances: Sequence[dlite.Instance],
+    driver: str,
+    location: str,
+    options: str | None = None,
+) -> None:
+    """Save all `instances` to one storage, which is opened only once."""
+    with dlite.Storage(driver, location, options) as storage:
+        for inst in instances:
+            storage.save(inst)
+
+
+def serialise(
+    inst: dlite.Instance | Sequence[dlite.Instance],
+    driver: str,
+    options: str | None = None,
+) -> bytes:
+    """Serialise `inst` with the given DLite driver and return the result.
+
+    If `inst` is a sequence of instances, they are all serialised to the
+    same storage.
+
+    Instances are serialised in memory with `Instance.to_bytes()` for the
+    drivers in `BYTES_DRIVERS`.  Otherwise, or if the driver fails to
+    serialise to bytes, the instance is saved to a temporary file which
+    is read back.  Collections are always saved to a temporary file, since
+    `to_bytes()` doesn't include the instances in the collection.
+    """
+    if (
+        isinstance(inst, dlite.Instance)
+        and not isinstance(inst, dlite.Collection)
+        and driver in BYTES_DRIVERS
+    ):
+        try:
+            with dlite.silent:
+                return bytes(inst.to_bytes(driver, options))
+        except dlite.DLiteError:
+            pass
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        if isinstance(inst, dlite.Instance):
+            inst.save(driver, f"{tmpdir}/data", options)
+        else:
+            save_instances(inst, driver, f"{tmpdir}/data", options)
+        with Path(f"{tmpdir}/data").open("rb") as f:
+            return f.read()
 
 
 def individual_iri(
@@ -11,10 +11,12 @@ from pydantic.dataclasses import Field, dataclass
 
 from oteapi_dlite.models import DLiteConfiguration, DLiteResult
 from oteapi_dlite.utils import (
+    acquire_triplestore,
     get_collection,
-    get_triplestore,
+    release_triplestore,
     update_collection,
 )
+from oteapi_dlite.utils.triples import expanded_triples, missing_triples
 
 
 class DLiteMappingStrategyConfig(DLiteConfiguration):
@@ -55,7 +57,7 @@ class DLiteMappingStrategy:
         """Initialize strategy."""
         config = self.mapping_config.configuration
 
-        coll = get_collection(config.collection_id)
+        coll = get_collection(config.collection_id, config.dlite_settings)
 
         kb_settings = config.dlite_settings.get("tripper.triplestore")
         if isinstance(kb_settings, str):
@@ -69,30 +71,43 @@ class DLiteMappingStrategy:
             # This block will only be run by mypy when checking typing
             assert isinstance(kb_settings, dict) or kb_settings is None  # nosec
 
-        ts = get_triplestore(kb_settings=kb_settings, collection_id=coll.uuid)
-
-        if self.mapping_config.prefixes:
-            for prefix, iri in self.mapping_config.prefixes.items():
-                ts.bind(prefix, iri)
-
-        if self.mapping_config.triples:
-            ts.add_triples(
-                [
-                    [
-                        ts.expand_iri(t) if isinstance(t, str) else t
-                        for t in triple
-                    ]
-                    for triple in self.mapping_config.triples
-                ]
-            )
+        ts = acquire_triplestore(
+            kb_settings=kb_settings, collection_id=coll.uuid
+        )
 
-        update_collection(coll)
+        dirty = False
+        try:
+            # The prefixes are only bound to triplestores owned by this
+            # mapping.  Pooled triplestores may be shared with other
+            # pipelines, so for them the prefixes are only used for
+            # expanding the triples of this mapping.
+            if self.mapping_config.prefixes and not kb_settings:
+                for prefix, iri in self.mapping_config.prefixes.items():
+                    ts.bind(prefix, iri)
+
+            if self.mapping_config.triples:
+                triples = missing_triples(
+                    ts,
+                    expanded_triples(
+                        ts,
+                        self.mapping_config.triples,
+                        prefixes=self.mapping_config.prefixes,
+                    ),
+                )
+                if triples:
+                    ts.add_triples(triples)
+                    dirty = True
+        finally:
+            release_triplestore(ts, dirty=dirty)
+
+        update_collection(coll, dlite_settings=config.dlite_settings)
         return DLiteResult(collection_id=coll.uuid)
 
     def get(self) -> DLiteResult:
         """Execute strategy and return a dictionary."""
         return DLiteResult(
             collection_id=get_collection(
-                self.mapping_config.configuration.collection_id
+                self.mapping_config.configuration.collection_id,
+                self.mapping_config.configuration.dlite_settings,
             ).uuid
         )
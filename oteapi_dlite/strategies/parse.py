@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Annotated, Literal
 
@@ -18,11 +20,15 @@ from oteapi.plugins import create_strategy
 from pydantic import AnyHttpUrl, Field
 from pydantic.dataclasses import dataclass
 
-from oteapi_dlite.models import DLiteResult
+from oteapi_dlite.models import DLiteConfiguration, DLiteResult
 from oteapi_dlite.utils import get_collection, get_driver, update_collection
 
+# Drivers that can load instances directly from bytes with
+# `Instance.from_bytes()`.  Other drivers load via a temporary file.
+BYTES_DRIVERS = {"json", "yaml"}
 
-class DLiteParseConfig(DLiteResult):
+
+class DLiteParseConfig(DLiteConfiguration):
     """Configuration for generic DLite parser."""
 
     # "Required" resource strategy fields
@@ -100,6 +106,46 @@ class DLiteParseConfig(DLiteResult):
         ),
     ] = None
 
+    # Batch mode
+    locations: Annotated[
+        list[str] | None,
+        Field(
+            description=(
+                "Explicit locations of storages to parse in batch mode.  "
+                "Locations containing any of the characters '*?[' are "
+                "expanded as glob patterns."
+            ),
+        ),
+    ] = None
+    downloadUrls: Annotated[
+        list[HostlessAnyUrl] | None,
+        Field(
+            description=(
+                "URLs of resources to download and parse in batch mode."
+            ),
+        ),
+    ] = None
+    labels: Annotated[
+        list[str] | None,
+        Field(
+            description=(
+                "Optional labels of the new DLite instances in batch mode.  "
+                "Must have one label per parsed location and URL, in that "
+                "order."
+            ),
+        ),
+    ] = None
+    max_workers: Annotated[
+        int | None,
+        Field(
+            description=(
+                "Maximum number of threads used for downloading resources in "
+                "batch mode.  Defaults to the ThreadPoolExecutor default."
+            ),
+            gt=0,
+        ),
+    ] = None
+
 
 class DLiteParseParserConfig(ParserConfig):
     """DLite parse strategy resource config."""
@@ -134,7 +180,8 @@ class DLiteParseStrategy:
         """Initialize."""
         return DLiteResult(
             collection_id=get_collection(
-                self.parse_config.configuration.collection_id
+                self.parse_config.configuration.collection_id,
+                self.parse_config.configuration.dlite_settings,
             ).uuid
         )
 
@@ -149,7 +196,6 @@ class DLiteParseStrategy:
 
         """
         config = self.parse_config.configuration
-        cacheconfig = config.datacache_config
 
         driver = (
             config.driver
@@ -159,50 +205,33 @@ class DLiteParseStrategy:
             )
         )
 
-        # Create instance
-        if config.location:
-            inst = dlite.Instance.from_location(
-                driver=driver,
-                location=config.location,
-                options=config.options,
-                id=config.id,
+        coll = get_collection(config.collection_id, config.dlite_settings)
+
+        if config.locations or config.downloadUrls:
+            instances = self._parse_batch(driver)
+            labels = (
+                config.labels
+                if config.labels
+                else [inst.uuid for inst in instances]
             )
+            for label, inst in zip(labels, instances, strict=True):
+                coll.add(label, inst)
         else:
-            # Download the file
-            download_config = config.model_dump()
-            download_config["configuration"] = (
-                config.download_config.model_dump()
-            )
-            output = create_strategy("download", download_config).get()
-
-            if cacheconfig and cacheconfig.accessKey:
-                key = cacheconfig.accessKey
-            elif "key" in output:
-                key = output["key"]
-            else:
-                raise RuntimeError(
-                    "No data cache key provided for the downloaded content."
-                )
-
-            # See if we can extract file suffix from downloadUrl
-            if config.downloadUrl:
-                suffix = Path(str(config.downloadUrl)).suffix
-            else:
-                suffix = None
-
-            cache = DataCache(config.datacache_config)
-            with cache.getfile(key, suffix=suffix) as location:
+            # Create instance
+            if config.location:
                 inst = dlite.Instance.from_location(
                     driver=driver,
-                    location=str(location),
+                    location=config.location,
                     options=config.options,
                     id=config.id,
                 )
+            else:
+                key = self._download(config.downloadUrl)
+                inst = self._load(driver, key, config.downloadUrl, config.id)
 
-        # Insert inst into collection
-        coll = get_collection(config.collection_id)
-        label = config.label if config.label else inst.uuid
-        coll.add(label, inst)
+            # Insert inst into collection
+            label = config.label if config.label else inst.uuid
+            coll.add(label, inst)
 
         # __TODO__
         # See
@@ -214,5 +243,126 @@ class DLiteParseStrategy:
         # the collection should be written to a storage, such that it
         # can be shared with the other strategies.
 
-        update_collection(coll)
+        update_collection(coll, dlite_settings=config.dlite_settings)
         return DLiteResult(collection_id=coll.uuid)
+
+    def _parse_batch(self, driver: str) -> list[dlite.Instance]:
+        """Parse all locations and download URLs in batch mode.
+
+        The resources are downloaded concurrently in a thread pool.  The
+        instances are decoded serially in the calling thread as the
+        downloads complete.  Decoding in the thread pool would not be
+        faster, since the DLite Python bindings hold the GIL while
+        decoding.  It would also not be safe, since DLite storage plugins
+        are not guaranteed to be thread safe and the error state of DLite
+        (e.g. `dlite.silent`) is global to the process.
+
+        Locations containing wildcards are expanded with
+        `pathlib.Path.glob()`.
+
+        Returns:
+            The new instances, in the order of the locations followed by
+            the download URLs.
+
+        """
+        config = self.parse_config.configuration
+        cacheconfig = config.datacache_config
+
+        locations: list[str] = []
+        for location in config.locations or ():
+            if re.search(r"[*?[]", location):
+                path = Path(location)
+                root = Path(path.anchor) if path.is_absolute() else Path()
+                pattern = str(path.relative_to(root))
+                locations.extend(sorted(str(p) for p in root.glob(pattern)))
+            else:
+                locations.append(location)
+        urls = config.downloadUrls or []
+
+        if config.labels and len(config.labels) != len(locations) + len(urls):
+            raise ValueError(
+                f"length of `labels` (={len(config.labels)}) doesn't match "
+                "number of parsed resources "
+                f"(={len(locations) + len(urls)})"
+            )
+        if cacheconfig and cacheconfig.accessKey and len(urls) > 1:
+            raise ValueError(
+                "`datacache_config.accessKey` cannot be used when parsing "
+                "several download URLs."
+            )
+
+        instances = [
+            dlite.Instance.from_location(
+                driver=driver,
+                location=location,
+                options=config.options,
+            )
+            for location in locations
+        ]
+        if urls:
+            with ThreadPoolExecutor(max_workers=config.max_workers) as executor:
+                for url, key in zip(
+                    urls, executor.map(self._download, urls), strict=True
+                ):
+                    instances.append(self._load(driver, key, url))
+        return instances
+
+    def _download(self, download_url: HostlessAnyUrl | None) -> str:
+        """Download `download_url` and return its data cache key."""
+        config = self.parse_config.configuration
+        cacheconfig = config.datacache_config
+
+        download_config = config.model_dump()
+        download_config["downloadUrl"] = download_url
+        download_config["configuration"] = config.download_config.model_dump()
+        output = create_strategy("download", download_config).get()
+
+        if cacheconfig and cacheconfig.accessKey:
+            return cacheconfig.accessKey
+        if "key" in output:
+            return output["key"]
+        raise RuntimeError(
+            "No data cache key provided for the downloaded content."
+        )
+
+    def _load(
+        self,
+        driver: str,
+        key: str,
+        download_url: HostlessAnyUrl | None,
+        inst_id: str | None = None,
+    ) -> dlite.Instance:
+        """Load an instance from the downloaded content stored in the data
+        cache under `key`.
+
+        For drivers in `BYTES_DRIVERS`, the instance is loaded directly from
+        the cached content with `Instance.from_bytes()`.  Otherwise, or if
+        that fails, the content is written to a temporary file, which is
+        loaded with `Instance.from_location()`.
+        """
+        config = self.parse_config.configuration
+        cache = DataCache(config.datacache_config)
+
+        if driver in BYTES_DRIVERS:
+            data = cache.get(key)
+            if isinstance(data, str):
+                data = data.encode()
+            if isinstance(data, bytes | bytearray):
+                try:
+                    with dlite.silent:
+                        return dlite.Instance.from_bytes(
+                            driver, data, options=config.options, id=inst_id
+                        )
+                except dlite.DLiteError:
+                    pass
+
+        # See if we can extract file suffix from downloadUrl
+        suffix = Path(str(download_url)).suffix if download_url else None
+
+        with cache.getfile(key, suffix=suffix) as location:
+            return dlite.Instance.from_location(
+                driver=driver,
+                location=str(location),
+                options=config.options,
+                id=inst_id,
+            )
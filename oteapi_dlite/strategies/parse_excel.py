@@ -2,27 +2,86 @@
 
 from __future__ import annotations
 
+import hashlib
+import json
 import re
-from random import getrandbits
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
 from typing import TYPE_CHECKING, Annotated, Literal
 
 import dlite
 import numpy as np
 from dlite.datamodel import DataModel
-from oteapi.models import HostlessAnyUrl, ParserConfig, ResourceConfig
+from openpyxl import load_workbook
+from openpyxl.utils import get_column_letter
+from oteapi.datacache import DataCache
+from oteapi.models import (
+    AttrDict,
+    HostlessAnyUrl,
+    ParserConfig,
+    ResourceConfig,
+)
 from oteapi.plugins import create_strategy
-from oteapi.strategies.parse.excel_xlsx import XLSXParseConfig
+from oteapi.strategies.parse.excel_xlsx import (
+    XLSXParseConfig,
+    get_column_indices,
+    set_model_defaults,
+)
 from pydantic import AnyHttpUrl, Field
 from pydantic.dataclasses import dataclass
 
-from oteapi_dlite.models import DLiteResult
-from oteapi_dlite.utils import dict2recarray, get_collection, update_collection
+from oteapi_dlite.models import DLiteConfiguration, DLiteResult
+from oteapi_dlite.utils import (
+    column2array,
+    dict2recarray,
+    get_collection,
+    update_collection,
+)
 
 if TYPE_CHECKING:  # pragma: no cover
-    from typing import Any
+    from collections.abc import Callable, Iterable, Iterator, Sequence
+    from concurrent.futures import Executor, Future
+    from typing import Any, TypeVar
 
+    from openpyxl.workbook.workbook import Workbook
+    from openpyxl.worksheet.worksheet import Worksheet
 
-class DLiteExcelParseConfig(DLiteResult):
+    T = TypeVar("T")
+    R = TypeVar("R")
+
+
+class DLiteExcelSheetConfig(AttrDict):
+    """Configuration of a worksheet region parsed in batch mode."""
+
+    excel_config: Annotated[
+        XLSXParseConfig,
+        Field(
+            description="Excel configuration selecting the worksheet region.",
+        ),
+    ]
+    label: Annotated[
+        str,
+        Field(
+            description="Label for the new instance in the collection.",
+        ),
+    ]
+    id: Annotated[
+        str | None, Field(description="Optional id on new instance.")
+    ] = None
+    entity: Annotated[
+        AnyHttpUrl | None,
+        Field(
+            description=(
+                "URI of DLite metadata of the new instance. If not provided, "
+                "the metadata will be inferred from the worksheet region."
+            ),
+        ),
+    ] = None
+
+
+class DLiteExcelParseConfig(DLiteConfiguration):
     """Configuration for DLite Excel parser."""
 
     # Resource config
@@ -53,17 +112,65 @@ class DLiteExcelParseConfig(DLiteResult):
     ] = "excel-data"
 
     excel_config: Annotated[
-        XLSXParseConfig,
+        XLSXParseConfig | None,
         Field(
-            description="DLite-specific excel configurations.",
+            description=(
+                "DLite-specific excel configurations.  Required unless "
+                "`sheets` is given."
+            ),
         ),
-    ]
+    ] = None
     storage_path: Annotated[
         str | None,
         Field(
             description="Path to metadata storage",
         ),
     ] = None
+    streaming: Annotated[
+        bool,
+        Field(
+            description=(
+                "Whether to stream the rows of the worksheet in chunks into "
+                "preallocated column arrays, instead of first reading the "
+                "whole worksheet region into Python lists.  Reduces the peak "
+                "memory usage for large workbooks.  Unlike the core "
+                "excel_xlsx parser used otherwise, streaming reads the "
+                "selected columns correctly if `col_from` is not the first "
+                "column."
+            ),
+        ),
+    ] = False
+    chunk_size: Annotated[
+        int,
+        Field(
+            description="Number of rows read at a time in streaming mode.",
+            gt=0,
+        ),
+    ] = 10000
+    sheets: Annotated[
+        list[DLiteExcelSheetConfig] | None,
+        Field(
+            description=(
+                "Worksheet regions to parse in batch mode.  The workbook is "
+                "downloaded and opened once and one instance is added to the "
+                "collection for each region, which is streamed as in "
+                "streaming mode.  The download and data cache configurations "
+                "are taken from the first region.  If given, `id`, `label` "
+                "and `excel_config` are ignored."
+            ),
+        ),
+    ] = None
+    max_workers: Annotated[
+        int | None,
+        Field(
+            description=(
+                "Maximum number of threads used for reading the worksheet "
+                "regions in batch mode.  By default the regions are read "
+                "sequentially."
+            ),
+            gt=0,
+        ),
+    ] = None
 
 
 class DLiteExcelParserConfig(ParserConfig):
@@ -105,6 +212,23 @@ class DLiteExcelSessionUpdate(DLiteResult):
     ]
 
 
+class DLiteExcelBatchSessionUpdate(DLiteResult):
+    """Class for returning values from DLite excel parser in batch mode."""
+
+    inst_uuids: Annotated[
+        list[str],
+        Field(
+            description="UUIDs of the new instances.",
+        ),
+    ]
+    labels: Annotated[
+        list[str],
+        Field(
+            description="Labels of the new instances in the collection.",
+        ),
+    ]
+
+
 @dataclass
 class DLiteExcelStrategy:
     """Parse strategy for Excel files.
@@ -122,11 +246,12 @@ class DLiteExcelStrategy:
         """Initialize."""
         return DLiteResult(
             collection_id=get_collection(
-                self.parse_config.configuration.collection_id
+                self.parse_config.configuration.collection_id,
+                self.parse_config.configuration.dlite_settings,
             ).uuid
         )
 
-    def get(self) -> DLiteExcelSessionUpdate:
+    def get(self) -> DLiteExcelSessionUpdate | DLiteExcelBatchSessionUpdate:
         """Execute the strategy.
 
         This method will be called through the strategy-specific endpoint
@@ -143,9 +268,153 @@ class DLiteExcelStrategy:
         if config.mediaType is None:
             raise ValueError("mediaType is required.")
 
+        if config.sheets:
+            return self._get_sheets(config.sheets)
+        if config.excel_config is None:
+            raise ValueError("Either excel_config or sheets is required.")
+
+        if config.streaming:
+            with self._open_workbook(config.excel_config) as workbook:
+                columns = read_worksheet(
+                    workbook[config.excel_config.worksheet],
+                    config.excel_config,
+                    chunk_size=config.chunk_size,
+                )
+        else:
+            columns = self._parse_columns(config.excel_config)
+
+        inst = self._create_instance(
+            columns, self.parse_config.entity, config.id
+        )
+
+        # Release the column data before updating the collection
+        del columns
+
+        # Insert inst into collection
+        coll = get_collection(config.collection_id, config.dlite_settings)
+        coll.add(config.label, inst)
+
+        update_collection(coll, dlite_settings=config.dlite_settings)
+        return DLiteExcelSessionUpdate(
+            collection_id=coll.uuid,
+            inst_uuid=inst.uuid,
+            label=config.label,
+        )
+
+    def _get_sheets(
+        self, sheets: list[DLiteExcelSheetConfig]
+    ) -> DLiteExcelBatchSessionUpdate:
+        """Parse the worksheet regions in `sheets` in batch mode.
+
+        Returns:
+            The UUIDs and labels of the new instances.
+
+        """
+        config = self.parse_config.configuration
+        coll = get_collection(config.collection_id, config.dlite_settings)
+        inst_uuids = []
+
+        with self._open_workbook(sheets[0].excel_config) as workbook:
+
+            def read(sheet: DLiteExcelSheetConfig) -> dict[str, np.ndarray]:
+                return read_worksheet(
+                    workbook[sheet.excel_config.worksheet],
+                    sheet.excel_config,
+                    chunk_size=config.chunk_size,
+                )
+
+            if config.max_workers and config.max_workers > 1:
+                executor = ThreadPoolExecutor(max_workers=config.max_workers)
+                results = bounded_map(
+                    executor, read, sheets, ahead=config.max_workers
+                )
+            else:
+                executor = None
+                results = map(read, sheets)
+
+            try:
+                # Instances are created in this thread as the regions are
+                # read, such that the columns of each region can be
+                # released once its instance is created.  At most
+                # `max_workers` regions are read ahead.
+                for sheet, columns in zip(sheets, results, strict=True):
+                    inst = self._create_instance(
+                        columns, sheet.entity, sheet.id
+                    )
+                    coll.add(sheet.label, inst)
+                    inst_uuids.append(inst.uuid)
+                    del columns
+            finally:
+                if executor:
+                    executor.shutdown(cancel_futures=True)
+
+        update_collection(coll, dlite_settings=config.dlite_settings)
+        return DLiteExcelBatchSessionUpdate(
+            collection_id=coll.uuid,
+            inst_uuids=inst_uuids,
+            labels=[sheet.label for sheet in sheets],
+        )
+
+    def _create_instance(
+        self,
+        columns: dict[str, Any],
+        meta_uri: AnyHttpUrl | None,
+        inst_id: str | None,
+    ) -> dlite.Instance:
+        """Create a new instance from parsed columns.
+
+        Arguments:
+            columns: A dict mapping column names to column values.
+            meta_uri: URI of the metadata of the new instance.  If None,
+                the metadata is inferred from the columns.
+            inst_id: Optional id of the new instance.
+
+        Returns:
+            The new instance.
+
+        """
+        config = self.parse_config.configuration
+        names, units = _split_column_names(columns)
+        if all(isinstance(arr, np.ndarray) for arr in columns.values()):
+            arrays = list(columns.values())
+            # Zero-length record array, only used for inferring metadata
+            rec = np.rec.fromarrays(
+                [arr[:0] for arr in arrays],
+                dtype=[
+                    (name, arr.dtype)
+                    for name, arr in zip(names, arrays, strict=True)
+                ],
+            )
+        else:
+            rec = dict2recarray(columns, names=names)
+            arrays = [rec[name] for name in names]
+        nrows = len(arrays[0]) if arrays else 0
+
+        if meta_uri:
+            if config.storage_path is not None:
+                for storage_path in config.storage_path.split("|"):
+                    dlite.storage_path.append(storage_path)
+            meta = dlite.get_instance(str(meta_uri))
+            # check the metadata config would go here
+        else:
+            meta = infer_metadata(rec, units=units)
+
+        inst = meta(dimensions=[nrows], id=inst_id)
+        for name, arr in zip(names, arrays, strict=True):
+            inst[name] = arr
+        return inst
+
+    def _parse_columns(self, excel_config: XLSXParseConfig) -> dict[str, Any]:
+        """Parse the worksheet region with the core excel_xlsx parser.
+
+        Returns:
+            A dict mapping column names to lists of column values.
+
+        """
+        config = self.parse_config.configuration
         xlsx_config = {
             "parserType": "parser/excel_xlsx",
-            "configuration": config.excel_config.model_dump(),
+            "configuration": excel_config.model_dump(),
             "entity": (
                 self.parse_config.entity
                 if self.parse_config.entity
@@ -159,45 +428,271 @@ class DLiteExcelStrategy:
             }
         )
         parser = create_strategy("parse", xlsx_config)
-        columns: dict[str, Any] = parser.get()["data"]
+        return parser.get()["data"]
+
+    @contextmanager
+    def _open_workbook(
+        self, excel_config: XLSXParseConfig
+    ) -> Iterator[Workbook]:
+        """Download the workbook and open it in read-only mode.
+
+        Arguments:
+            excel_config: Excel configuration providing the download and
+                data cache configurations.
+
+        Yields:
+            The opened workbook.  It is closed when leaving the context.
+
+        """
+        config = self.parse_config.configuration
 
-        # NOTE: Using 'strict=False' in the zip call could allow mismatched
-        # lengths between the inputs without raising an error.
-        names, units = zip(
-            *[split_column_name(column) for column in columns], strict=False
+        download_config = excel_config.model_dump()
+        download_config.update(
+            {
+                "downloadUrl": config.downloadUrl,
+                "mediaType": config.mediaType,
+                "configuration": excel_config.download_config.model_dump(),
+            }
         )
-        rec = dict2recarray(columns, names=names)
+        output = create_strategy("download", download_config).get()
 
-        if not isinstance(units, (list, tuple)):
-            # This check is to satisfy mypy for the `infer_metadata` call below.
-            raise TypeError(
-                f"units must be a list or tuple, instead it was {type(units)}"
+        cacheconfig = excel_config.datacache_config
+        if cacheconfig and cacheconfig.accessKey:
+            key = cacheconfig.accessKey
+        elif "key" in output:
+            key = output["key"]
+        else:
+            raise RuntimeError(
+                "No data cache key provided for the downloaded content."
             )
 
-        meta_uri = self.parse_config.entity
-        if meta_uri:
-            if config.storage_path is not None:
-                for storage_path in config.storage_path.split("|"):
-                    dlite.storage_path.append(storage_path)
-            meta = dlite.get_instance(str(meta_uri))
-            # check the metadata config would go here
-        else:
-            meta = infer_metadata(rec, units=units)
+        cache = DataCache(cacheconfig)
+        with cache.getfile(key, suffix=".xlsx") as filename:
+            workbook = load_workbook(
+                filename=filename, read_only=True, data_only=True
+            )
+            try:
+                yield workbook
+            finally:
+                # Close the file before it is removed when leaving the
+                # with statement
+                workbook.close()
 
-        inst = meta(dimensions=[len(rec)], id=config.id)
-        for name in names:
-            inst[name] = rec[name]
 
-        # Insert inst into collection
-        coll = get_collection(config.collection_id)
-        coll.add(config.label, inst)
+class ColumnBuffer:
+    """Growable array buffer for a worksheet column.
 
-        update_collection(coll)
-        return DLiteExcelSessionUpdate(
-            collection_id=coll.uuid,
-            inst_uuid=inst.uuid,
-            label=config.label,
+    Chunks of column values are converted with `column2array()` and
+    copied into a preallocated array, which is only reallocated if it
+    runs out of capacity or if a chunk requires a wider dtype.
+
+    Arguments:
+        capacity: Initial number of rows to allocate space for.
+
+    """
+
+    def __init__(self, capacity: int = 0) -> None:
+        self.capacity = capacity
+        self.data: np.ndarray | None = None
+        self.nrows = 0
+
+    def append(self, values: Sequence[Any]) -> None:
+        """Append a chunk of column values to the buffer."""
+        nvalues = len(values)
+        if all(value is None for value in values):
+            if self.data is not None:
+                dtype = _missing_dtype(self.data.dtype)
+                self._reserve(self.nrows + nvalues, dtype)
+                self.data[self.nrows : self.nrows + nvalues] = _MISSING[
+                    dtype.kind
+                ]
+            self.nrows += nvalues
+            return
+
+        arr = column2array(values)
+        if not isinstance(arr, np.ndarray):
+            arr = np.array(values, dtype=object)
+
+        if self.data is None:
+            # Leading missing values need a dtype that can represent them
+            nleading = self.nrows
+            dtype = _missing_dtype(arr.dtype) if nleading else arr.dtype
+            self._reserve(nleading + nvalues, dtype)
+            if TYPE_CHECKING:  # pragma: no cover
+                assert self.data is not None  # nosec
+            if nleading:
+                self.data[:nleading] = _MISSING[dtype.kind]
+        else:
+            try:
+                dtype = np.result_type(self.data.dtype, arr.dtype)
+            except TypeError:
+                dtype = np.dtype(object)
+            self._reserve(self.nrows + nvalues, dtype)
+
+        if TYPE_CHECKING:  # pragma: no cover
+            assert self.data is not None  # nosec
+        self.data[self.nrows : self.nrows + nvalues] = arr
+        self.nrows += nvalues
+
+    def array(self) -> np.ndarray:
+        """Return the buffered column as an array.
+
+        The returned array is a view of the buffer.  Columns with only
+        missing values are returned as float arrays filled with NaN.
+        """
+        if self.data is None:
+            return np.full(self.nrows, np.nan)
+        return self.data[: self.nrows]
+
+    def _reserve(self, nrows: int, dtype: np.dtype) -> None:
+        """Ensure that the buffer has space for `nrows` rows of `dtype`."""
+        if (
+            self.data is not None
+            and dtype == self.data.dtype
+            and nrows <= len(self.data)
+        ):
+            return
+        self.capacity = max(self.capacity, nrows)
+        if self.data is not None and nrows > len(self.data):
+            self.capacity = max(self.capacity, 2 * len(self.data))
+        data = np.empty(self.capacity, dtype=dtype)
+        if self.data is not None:
+            data[: self.nrows] = self.data[: self.nrows]
+        self.data = data
+
+
+# Values representing missing data for each dtype kind
+_MISSING = {"f": np.nan, "c": np.nan, "U": "", "S": b"", "O": None}
+
+
+def _missing_dtype(dtype: np.dtype) -> np.dtype:
+    """Return a dtype that can represent both `dtype` and missing values."""
+    if dtype.kind in _MISSING:
+        return dtype
+    return np.result_type(dtype, np.float64)
+
+
+def bounded_map(
+    executor: Executor,
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    ahead: int,
+) -> Iterator[R]:
+    """Like `executor.map(fn, items)`, but at most `ahead` items are
+    submitted to `executor` before their results are consumed.
+
+    This bounds the number of results kept in memory when they are
+    produced faster than they are consumed.
+    """
+    pending: deque[Future[R]] = deque()
+    for item in items:
+        if len(pending) >= ahead:
+            yield pending.popleft().result()
+        pending.append(executor.submit(fn, item))
+    while pending:
+        yield pending.popleft().result()
+
+
+def read_worksheet(
+    worksheet: Worksheet,
+    excel_config: XLSXParseConfig,
+    chunk_size: int = 10000,
+) -> dict[str, np.ndarray]:
+    """Read a rectangular region of a worksheet into column arrays.
+
+    The region and header are selected as in the core excel_xlsx parser,
+    with one exception.  The core parser indexes the rows read from the
+    worksheet by absolute column number, so it reads shifted columns or
+    fails with an IndexError if the first selected column is not column
+    A.  This function reads the selected columns in all cases.
+    Rows are streamed from the worksheet in chunks of `chunk_size` rows
+    into `ColumnBuffer`s, which are preallocated from the worksheet
+    dimensions when these are known.  Missing values and dtypes are
+    handled as in `dict2recarray()`.
+
+    Arguments:
+        worksheet: The worksheet to read.  Typically from a workbook opened
+            in read-only mode.
+        excel_config: Configuration selecting the region to read.
+        chunk_size: Number of rows to read at a time.
+
+    Returns:
+        A dict mapping column names to column arrays.
+
+    """
+    config = excel_config.model_copy()
+    if getattr(worksheet.parent, "read_only", False):
+        # The dimensions of read-only worksheets may be missing, in which
+        # case they are computed by scanning the worksheet
+        worksheet.calculate_dimension(force=True)
+    set_model_defaults(config, worksheet)
+    columns = list(get_column_indices(config, worksheet))
+    min_col, max_col = min(columns), max(columns)
+    offsets = [col - min_col for col in columns]
+
+    header: list[Any] | None = None
+    if config.header_row:
+        row = next(
+            worksheet.iter_rows(
+                min_row=config.header_row,
+                max_row=config.header_row,
+                min_col=min_col,
+                max_col=max_col,
+                values_only=True,
+            )
         )
+        header = [row[offset] for offset in offsets]
+
+    if config.new_header:
+        if len(config.new_header) != len(columns):
+            raise TypeError(
+                f"length of `new_header` (={len(config.new_header)}) "
+                f"doesn't match number of columns (={len(columns)})"
+            )
+        if header:
+            header = [
+                old if new is None else new
+                for old, new in zip(header, config.new_header, strict=True)
+            ]
+        else:
+            header = list(config.new_header)
+
+    if header is None:
+        header = [get_column_letter(col) for col in columns]
+
+    capacity = (
+        config.row_to - config.row_from + 1
+        if config.row_to and config.row_from
+        else chunk_size
+    )
+    buffers = [ColumnBuffer(capacity) for _ in columns]
+    rows = worksheet.iter_rows(
+        min_row=config.row_from,
+        max_row=config.row_to,
+        min_col=min_col,
+        max_col=max_col,
+        values_only=True,
+    )
+    while chunk := list(islice(rows, chunk_size)):
+        for buffer, offset in zip(buffers, offsets, strict=True):
+            buffer.append([row[offset] for row in chunk])
+
+    return {
+        str(name): buffer.array()
+        for name, buffer in zip(header, buffers, strict=True)
+    }
+
+
+def _split_column_names(
+    columns: dict[str, Any],
+) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    """Split column names into a tuple of names and a tuple of units."""
+    if not columns:
+        return (), ()
+    names, units = zip(
+        *[split_column_name(column) for column in columns], strict=True
+    )
+    return names, units
 
 
 def split_column_name(column: str) -> tuple[str, str]:
@@ -209,20 +704,40 @@ def split_column_name(column: str) -> tuple[str, str]:
     return name, unit
 
 
-def infer_metadata(rec: np.recarray, units: tuple[str, ...]) -> dlite.Instance:
-    """Infer dlite metadata from recarray `rec`."""
-    # bandit issue B311:blacklist.
-    # This is not relevant here because we are not using this for
-    # security/cryptographic purposes - hence the nosec.
-    rnd = getrandbits(128)  # nosec
-    uri = f"http://onto-ns.com/meta/1.0/generated_from_excel_{rnd:0x}"
-    metadata = DataModel(
-        uri,
-        description="Generated datamodel from excel file.",
-    )
-    metadata.add_dimension("nrows", "Number of rows.")
-    for i, name in enumerate(rec.dtype.names):
-        dtype = rec[name].dtype
-        ptype = "string" if dtype.kind == "U" else dtype.name
-        metadata.add_property(name, type=ptype, shape=["nrows"], unit=units[i])
-    return metadata.get()
+# Process-local cache of inferred metadata, keyed by URI
+_INFERRED_METADATA: dict[str, dlite.Instance] = {}
+
+
+def infer_metadata(rec: np.ndarray, units: tuple[str, ...]) -> dlite.Instance:
+    """Infer dlite metadata from recarray `rec`.
+
+    The URI of the inferred metadata is generated from a hash of the
+    column names, types and units, such that worksheet regions with the
+    same columns share the same metadata.  Already inferred metadata is
+    reused, either from a process-local cache or if it can be found by
+    DLite (e.g. in `dlite.storage_path`).
+    """
+    names = rec.dtype.names if rec.dtype.names else ()
+    ptypes = [
+        "string" if rec[name].dtype.kind == "U" else rec[name].dtype.name
+        for name in names
+    ]
+    signature = json.dumps([names, ptypes, units]).encode()
+    digest = hashlib.sha256(signature).hexdigest()[:32]
+    uri = f"http://onto-ns.com/meta/1.0/generated_from_excel_{digest}"
+
+    if uri in _INFERRED_METADATA:
+        return _INFERRED_METADATA[uri]
+    if dlite.has_instance(uri):
+        meta = dlite.get_instance(uri)
+    else:
+        metadata = DataModel(
+            uri,
+            description="Generated datamodel from excel file.",
+        )
+        metadata.add_dimension("nrows", "Number of rows.")
+        for name, ptype, unit in zip(names, ptypes, units, strict=True):
+            metadata.add_property(name, type=ptype, shape=["nrows"], unit=unit)
+        meta = metadata.get()
+    _INFERRED_METADATA[uri] = meta
+    return meta
@@ -3,25 +3,56 @@
 from __future__ import annotations
 
 import logging
-from typing import Annotated, Literal
+from typing import TYPE_CHECKING, Annotated, Literal
 
 import numpy as np
 from oteapi.datacache import DataCache
 from oteapi.models import ParserConfig, ResourceConfig
 from oteapi.plugins import create_strategy
-from oteapi.strategies.parse.image import ImageConfig
+from oteapi.strategies.parse.image import ImageConfig, SupportedFormat
 from PIL import Image
 from pydantic import AnyHttpUrl, Field, field_validator
 from pydantic.dataclasses import dataclass
 
-from oteapi_dlite.models import DLiteResult
+from oteapi_dlite.models import DLiteConfiguration, DLiteResult
 from oteapi_dlite.utils import get_collection, get_meta, update_collection
 
+if TYPE_CHECKING:  # pragma: no cover
+    from pathlib import Path
+    from typing import Any
+
+    from PIL import ImageFile
+
 LOGGER = logging.getLogger("oteapi_dlite.strategies")
 LOGGER.setLevel(logging.DEBUG)
 
-
-class DLiteImageConfig(ImageConfig, DLiteResult):
+# EXIF orientation tag (`PIL.ExifTags.Base.Orientation` since Pillow 9.4)
+EXIF_ORIENTATION = 0x0112
+
+# URI of datamodel describing tiled images
+TILING_URI = "http://onto-ns.com/meta/1.0/ImageTiling"
+
+# Number of bands for Pillow modes with 8 bits per band.  The raw data of
+# images in these modes is a plain band-interleaved raster, which can be
+# used directly as a uint8 array of shape (height, width, nbands).
+RASTER_MODES = {
+    "L": 1,
+    "P": 1,
+    "LA": 2,
+    "PA": 2,
+    "La": 2,
+    "RGB": 3,
+    "YCbCr": 3,
+    "LAB": 3,
+    "HSV": 3,
+    "RGBA": 4,
+    "RGBa": 4,
+    "RGBX": 4,
+    "CMYK": 4,
+}
+
+
+class DLiteImageConfig(ImageConfig, DLiteConfiguration):
     """Configuration for DLite image parser."""
 
     # Resource config
@@ -46,6 +77,31 @@ class DLiteImageConfig(ImageConfig, DLiteResult):
             description="Label to assign to the image in the collection.",
         ),
     ] = "image"
+    tile_height: Annotated[
+        int | None,
+        Field(
+            description=(
+                "If given, the image is split into tiles of this height.  "
+                "Each tile is added to the collection as a separate Image "
+                "instance labelled `<image_label>-tile-<row>-<column>` and an "
+                "ImageTiling instance describing the tiling is added with "
+                "label `image_label`.  Defaults to the image height if only "
+                "`tile_width` is given."
+            ),
+            gt=0,
+        ),
+    ] = None
+    tile_width: Annotated[
+        int | None,
+        Field(
+            description=(
+                "If given, the image is split into tiles of this width.  "
+                "See `tile_height`.  Defaults to the image width if only "
+                "`tile_height` is given."
+            ),
+            gt=0,
+        ),
+    ] = None
 
 
 class DLiteImageParserConfig(ParserConfig):
@@ -101,7 +157,8 @@ class DLiteImageParseStrategy:
         """Initialize."""
         return DLiteResult(
             collection_id=get_collection(
-                self.parse_config.configuration.collection_id
+                self.parse_config.configuration.collection_id,
+                self.parse_config.configuration.dlite_settings,
             ).uuid
         )
 
@@ -124,6 +181,9 @@ class DLiteImageParseStrategy:
         if config.mediaType is None:
             raise ValueError("mediaType is required.")
 
+        if config.tile_height or config.tile_width:
+            return self._get_tiles()
+
         # Configuration for ImageDataParseStrategy in oteapi-core
         core_config = {
             "parserType": "parser/image",
@@ -139,25 +199,223 @@ class DLiteImageParseStrategy:
         cache = DataCache()
         data = cache.get(output["image_key"])
         if isinstance(data, bytes):
-            data = np.asarray(
-                Image.frombytes(
-                    data=data,
-                    mode=output["image_mode"],
-                    size=output["image_size"],
-                )
+            data = image_array(
+                data, mode=output["image_mode"], size=output["image_size"]
             )
         if not isinstance(data, np.ndarray):
             raise TypeError(
                 "Expected image data to be a numpy array, instead it was "
                 f"{type(data)}."
             )
+        if data.ndim == 2:
+            data = data[:, :, np.newaxis]
 
         meta = get_meta(str(self.parse_config.entity))
         inst = meta(dimensions=data.shape)
         inst["data"] = data
 
-        coll = get_collection(config.collection_id)
+        coll = get_collection(config.collection_id, config.dlite_settings)
         coll.add(config.image_label, inst)
 
-        update_collection(coll)
+        update_collection(coll, dlite_settings=config.dlite_settings)
         return DLiteResult(collection_id=coll.uuid)
+
+    def _get_tiles(self) -> DLiteResult:
+        """Parse the image into tiles.
+
+        The downloaded content is written to a temporary file, from which
+        the tiles are read, converted and added to the collection one by
+        one with `read_region()`.  For formats storing the image in
+        strips or tiles, like uncompressed TIFF, only the strips or tiles
+        overlapping the current tile are decoded.  Other formats, like
+        PNG and JPEG, are decoded in full for each tile.
+        """
+        config = self.parse_config.configuration
+
+        if config.mediaType is None:
+            raise ValueError("mediaType is required.")
+
+        mime_format = config.mediaType.split("-")[-1]
+        image_format = SupportedFormat[mime_format].value
+
+        download_config = config.model_dump()
+        download_config["configuration"] = config.model_dump()
+        output = create_strategy("download", download_config).get()
+
+        if config.datacache_config and config.datacache_config.accessKey:
+            key = config.datacache_config.accessKey
+        elif "key" in output:
+            key = output["key"]
+        else:
+            raise RuntimeError(
+                "No data cache key provided for the downloaded content."
+            )
+
+        meta = get_meta(str(self.parse_config.entity))
+        tiling_meta = get_meta(TILING_URI)
+        coll = get_collection(config.collection_id, config.dlite_settings)
+
+        cache = DataCache(config.datacache_config)
+        with cache.getfile(key, suffix=mime_format) as filename:
+            with Image.open(filename, formats=[image_format]) as image:
+                size = image.size
+            left, top, right, bottom = (
+                config.crop if config.crop else (0, 0, *size)
+            )
+            tile_height = config.tile_height or bottom - top
+            tile_width = config.tile_width or right - left
+
+            labels, tops, lefts = [], [], []
+            for row, y in enumerate(range(top, bottom, tile_height)):
+                for column, x in enumerate(range(left, right, tile_width)):
+                    box = (
+                        x,
+                        y,
+                        min(x + tile_width, right),
+                        min(y + tile_height, bottom),
+                    )
+                    tile = read_region(filename, image_format, box)
+                    if config.image_mode:
+                        tile = tile.convert(mode=config.image_mode)
+                    data = image_array(
+                        tile.tobytes(), mode=tile.mode, size=tile.size
+                    )
+                    if data.ndim == 2:
+                        data = data[:, :, np.newaxis]
+
+                    inst = meta(dimensions=data.shape)
+                    inst["data"] = data
+                    label = f"{config.image_label}-tile-{row}-{column}"
+                    coll.add(label, inst)
+
+                    labels.append(label)
+                    tops.append(y - top)
+                    lefts.append(x - left)
+
+        tiling = tiling_meta(dimensions=[len(labels)])
+        tiling.height = bottom - top
+        tiling.width = right - left
+        tiling.tile_height = tile_height
+        tiling.tile_width = tile_width
+        tiling.labels = labels
+        tiling.top = tops
+        tiling.left = lefts
+        coll.add(config.image_label, tiling)
+
+        update_collection(coll, dlite_settings=config.dlite_settings)
+        return DLiteResult(collection_id=coll.uuid)
+
+
+def read_region(
+    filename: str | Path, image_format: str, box: tuple[int, int, int, int]
+) -> Image.Image:
+    """Read a region of an image file.
+
+    Only the encoded strips or tiles of the image that overlap `box` are
+    decoded.  Images stored as a single tile, like PNG and JPEG, and
+    images that need to be transposed according to their EXIF
+    orientation are decoded in full before cropping.
+
+    Decoding only some tiles relies on internals of Pillow.  If that
+    fails or gives a region of the wrong size, the image is decoded in
+    full before cropping.
+
+    Arguments:
+        filename: Path to the image file.
+        image_format: Pillow format of the image.
+        box: The region to read as a (left, top, right, bottom) tuple.
+
+    Returns:
+        Image of the region.
+
+    """
+    left, top, right, bottom = box
+    with Image.open(filename, formats=[image_format]) as image:
+        try:
+            region = decode_tiles(image, box)
+        except (AttributeError, TypeError, ValueError, OSError):
+            region = None
+        if region is not None and region.size == (right - left, bottom - top):
+            return region
+
+    with Image.open(filename, formats=[image_format]) as image:
+        return image.crop(box)
+
+
+def decode_tiles(
+    image: ImageFile.ImageFile, box: tuple[int, int, int, int]
+) -> Image.Image | None:
+    """Decode only the tiles of the newly opened `image` that overlap
+    `box` and return the region.
+
+    None is returned if all tiles overlap `box`, if the image is already
+    loaded or if it needs to be transposed according to its EXIF
+    orientation.  The tiles of
+    `image` are replaced, so it cannot be used after this call.
+    """
+    # Reading the EXIF data may load the image, e.g. for PNG
+    if image.getexif().get(EXIF_ORIENTATION, 1) != 1:
+        return None
+
+    left, top, right, bottom = box
+    full = (0, 0, *image.size)
+    tiles = [
+        (tile, (x0, y0, x1, y1))
+        for tile in image.tile
+        for x0, y0, x1, y1 in [tile[1] or full]
+        if x0 < right and y0 < bottom and x1 > left and y1 > top
+    ]
+    if not tiles or len(tiles) == len(image.tile):
+        return None
+
+    # Decode only the overlapping tiles into an image of the size of
+    # their bounding box
+    x0 = min(extents[0] for _, extents in tiles)
+    y0 = min(extents[1] for _, extents in tiles)
+    x1 = max(extents[2] for _, extents in tiles)
+    y1 = max(extents[3] for _, extents in tiles)
+    image.tile = [
+        shift_tile(tile, (ex0 - x0, ey0 - y0, ex1 - x0, ey1 - y0))
+        for tile, (ex0, ey0, ex1, ey1) in tiles
+    ]
+    image._size = (x1 - x0, y1 - y0)
+    if hasattr(image, "_tile_size"):
+        image._tile_size = image._size
+    return image.crop((left - x0, top - y0, right - x0, bottom - y0))
+
+
+def shift_tile(tile: Any, extents: tuple[int, int, int, int]) -> Any:
+    """Return a copy of the Pillow tile descriptor `tile` with new
+    `extents`.
+
+    Tile descriptors are named tuples since Pillow 11 and plain
+    `(decoder, extents, offset, args)` tuples before.
+    """
+    if hasattr(tile, "_replace"):
+        return tile._replace(extents=extents)
+    return (tile[0], extents, *tile[2:])
+
+
+def image_array(data: bytes, mode: str, size: tuple[int, int]) -> np.ndarray:
+    """Return raw image data as a NumPy array.
+
+    For images in one of the `RASTER_MODES`, the returned array of shape
+    (height, width, nbands) is a read-only view of `data`, i.e. no copy
+    is made.  Otherwise the image is decoded with Pillow.
+
+    Arguments:
+        data: Raw image data, as returned by `PIL.Image.tobytes()`.
+        mode: Pillow image mode.
+        size: Image size as a (width, height) tuple.
+
+    Returns:
+        Array with the image data.
+
+    """
+    width, height = size
+    nbands = RASTER_MODES.get(mode)
+    if nbands and len(data) == width * height * nbands:
+        return np.frombuffer(data, dtype=np.uint8).reshape(
+            height, width, nbands
+        )
+    return np.asarray(Image.frombytes(data=data, mode=mode, size=size))
@@ -11,11 +11,11 @@ from oteapi.models import FilterConfig
 from pydantic import Field
 from pydantic.dataclasses import dataclass
 
-from oteapi_dlite.models import DLiteResult
+from oteapi_dlite.models import DLiteConfiguration, DLiteResult
 from oteapi_dlite.utils import get_collection, update_collection
 
 
-class SerialiseConfig(DLiteResult):
+class SerialiseConfig(DLiteConfiguration):
     """DLite serialise-specific configurations."""
 
     driver: Annotated[
@@ -75,7 +75,8 @@ class SerialiseStrategy:
         """Initialize."""
         return DLiteResult(
             collection_id=get_collection(
-                self.filter_config.configuration.collection_id
+                self.filter_config.configuration.collection_id,
+                self.filter_config.configuration.dlite_settings,
             ).uuid
         )
 
@@ -83,7 +84,7 @@ class SerialiseStrategy:
         """Execute the strategy."""
         config = self.filter_config.configuration
 
-        coll = get_collection(config.collection_id)
+        coll = get_collection(config.collection_id, config.dlite_settings)
 
         storage = dlite.Storage(
             driver_or_url=config.driver,
@@ -97,5 +98,5 @@ class SerialiseStrategy:
                 inst = coll.get(label)
                 inst.save_to_storage(storage)
 
-        update_collection(coll)
+        update_collection(coll, dlite_settings=config.dlite_settings)
         return DLiteResult(collection_id=coll.uuid)
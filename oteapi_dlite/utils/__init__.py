@@ -5,15 +5,20 @@ This module provide some utility functions.
 
 from __future__ import annotations
 
-from .nputils import dict2recarray
+from .codecs import codec_from_settings
+from .nputils import column2array, dict2recarray
 from .utils import (
     RemoveItem,
     TypeMismatchError,
+    acquire_triplestore,
     get_collection,
     get_driver,
     get_instance,
+    get_instance_index,
+    get_instances,
     get_meta,
     get_triplestore,
+    release_triplestore,
     update_collection,
     update_dict,
 )
@@ -21,12 +26,18 @@ from .utils import (
 __all__ = (
     "RemoveItem",
     "TypeMismatchError",
+    "acquire_triplestore",
+    "codec_from_settings",
+    "column2array",
     "dict2recarray",
     "get_collection",
     "get_driver",
     "get_instance",
+    "get_instance_index",
+    "get_instances",
     "get_meta",
     "get_triplestore",
+    "release_triplestore",
     "update_collection",
     "update_dict",
 )
@@ -0,0 +1,126 @@
+"""Codecs for storing base snapshots of DLite collections in the data cache.
+
+The codec used for a collection is selected with the
+`oteapi_dlite.collection_codec` setting (see the SettingsStrategy) and
+recorded in the log of the collection in the data cache (see
+`oteapi_dlite.utils.delta`), such that the collection can be loaded
+without knowing the settings.
+
+Available codecs:
+
+- `json`: The JSON representation of the collection (default).
+- `json-zlib`: zlib-compressed JSON representation of the collection.
+  Collections are stored as relations with highly repetitive predicates,
+  labels and metadata URIs, so this typically reduces the size of the
+  stored snapshot by an order of magnitude.
+
+New codecs can be added with `register_codec()`.
+"""
+
+from __future__ import annotations
+
+import json
+import zlib
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import dlite
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Callable
+    from typing import Any
+
+
+# Label of the setting selecting the collection codec
+COLLECTION_CODEC_SETTING = "oteapi_dlite.collection_codec"
+
+# Name of the codec used when none is selected
+DEFAULT_CODEC = "json"
+
+
+@dataclass(frozen=True)
+class CollectionCodec:
+    """Codec for encoding and decoding a DLite collection."""
+
+    name: str
+    encode: Callable[[dlite.Collection], str | bytes]
+    decode: Callable[[str | bytes, str], dlite.Collection]
+
+
+CODECS: dict[str, CollectionCodec] = {}
+
+
+def register_codec(codec: CollectionCodec) -> None:
+    """Register a collection codec, replacing any codec with the same name."""
+    CODECS[codec.name] = codec
+
+
+def get_codec(name: str | None = None) -> CollectionCodec:
+    """Return the collection codec with the given name.
+
+    If `name` is None, the default codec is returned.
+    """
+    name = name if name else DEFAULT_CODEC
+    if name not in CODECS:
+        raise ValueError(
+            f"unknown collection codec: {name}. Available codecs are: "
+            f"{', '.join(CODECS)}"
+        )
+    return CODECS[name]
+
+
+def decode_any(data: str | bytes, collection_id: str) -> dlite.Collection:
+    """Decode a collection encoded with an unknown codec.
+
+    Strings are decoded as JSON.  For bytes, all registered codecs are
+    tried in turn.
+    """
+    if isinstance(data, str):
+        return get_codec("json").decode(data, collection_id)
+    for codec in CODECS.values():
+        try:
+            return codec.decode(data, collection_id)
+        except (dlite.DLiteError, TypeError, ValueError, zlib.error):
+            continue
+    raise ValueError(f"cannot decode collection with id {collection_id}")
+
+
+def codec_from_settings(dlite_settings: dict[str, Any]) -> str | None:
+    """Return the name of the collection codec selected in `dlite_settings`
+    or None if no codec is selected."""
+    name = dlite_settings.get(COLLECTION_CODEC_SETTING)
+    if isinstance(name, str) and name.startswith('"'):
+        name = json.loads(name)
+    if name is not None and not isinstance(name, str):
+        raise ValueError(
+            f"The `{COLLECTION_CODEC_SETTING}` setting must be a string."
+        )
+    return name
+
+
+def _json_encode(collection: dlite.Collection) -> str:
+    return collection.asjson()
+
+
+def _json_decode(data: str | bytes, collection_id: str) -> dlite.Collection:
+    return dlite.Instance.from_json(data, id=collection_id)
+
+
+def _json_zlib_encode(collection: dlite.Collection) -> bytes:
+    return zlib.compress(collection.asjson().encode(), level=1)
+
+
+def _json_zlib_decode(
+    data: str | bytes, collection_id: str
+) -> dlite.Collection:
+    if isinstance(data, str):
+        raise TypeError("json-zlib encoded collection must be bytes")
+    return dlite.Instance.from_json(
+        zlib.decompress(data).decode(), id=collection_id
+    )
+
+
+register_codec(CollectionCodec("json", _json_encode, _json_decode))
+register_codec(
+    CollectionCodec("json-zlib", _json_zlib_encode, _json_zlib_decode)
+)
@@ -0,0 +1,142 @@
+"""Incremental persistence of DLite collections.
+
+A collection stored in the data cache consists of a base snapshot
+(stored with the collection UUID as key) and a log (stored under
+`log_key(uuid)`).  The log records the generation of the collection,
+the codec the base snapshot is encoded with (see
+`oteapi_dlite.utils.codecs`), a digest of the base snapshot and a list
+of deltas.  Each delta records the relations added to and removed from
+the collection since the previous delta.  The log is compacted into a
+new base snapshot when it grows too long.
+
+Since all labels and instance references of a collection are stored as
+relations, a delta fully describes the change of a collection.
+
+Note that the value stored under the collection UUID is the base
+snapshot, which is neither necessarily current nor JSON.  Collections
+should be read with `oteapi_dlite.utils.get_collection()` and written
+with `oteapi_dlite.utils.update_collection()`.  A collection written
+directly as JSON under its UUID is still loaded correctly, since the
+log is only applied if its digest matches the stored base snapshot.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Any
+
+    import dlite
+
+    Relation = tuple[str, str, str, str | None]
+
+
+# Maximum number of deltas before the log is compacted into a new base
+# snapshot.
+MAX_DELTAS = 16
+
+
+def log_key(collection_id: str) -> str:
+    """Return the data cache key for the log of a collection."""
+    return f"{collection_id}#log"
+
+
+def base_digest(value: str | bytes) -> str:
+    """Return a digest of a base snapshot as stored in the data cache."""
+    if isinstance(value, str):
+        value = value.encode()
+    return hashlib.sha256(value).hexdigest()
+
+
+def relation_set(collection: dlite.Collection) -> frozenset[Relation]:
+    """Return the relations of `collection` as a frozenset of
+    (s, p, o, d) tuples."""
+    if not collection.nrelations:
+        return frozenset()
+    return frozenset((r.s, r.p, r.o, r.d) for r in collection.relations)
+
+
+@dataclass
+class CollectionDelta:
+    """Change of a collection, described as added and removed relations."""
+
+    added: list[Relation] = field(default_factory=list)
+    removed: list[Relation] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.added) + len(self.removed)
+
+    @classmethod
+    def from_relations(
+        cls, old: frozenset[Relation], new: frozenset[Relation]
+    ) -> CollectionDelta:
+        """Return the delta transforming relations `old` into `new`."""
+        return cls(added=list(new - old), removed=list(old - new))
+
+    @classmethod
+    def from_dict(cls, dct: dict[str, Any]) -> CollectionDelta:
+        """Create a delta from its dict representation."""
+        return cls(
+            added=[tuple(r) for r in dct["added"]],
+            removed=[tuple(r) for r in dct["removed"]],
+        )
+
+    def asdict(self) -> dict[str, Any]:
+        """Return a dict representation of the delta that can be stored in
+        the data cache."""
+        return {
+            "added": [list(r) for r in self.added],
+            "removed": [list(r) for r in self.removed],
+        }
+
+    def apply(self, collection: dlite.Collection) -> None:
+        """Apply the delta to `collection`."""
+        for s, p, o, d in self.removed:
+            collection.remove_relations(s, p, o, d)
+        for s, p, o, d in self.added:
+            collection.add_relation(s, p, o, d)
+
+
+@dataclass
+class CollectionLog:
+    """Log of a collection stored in the data cache.
+
+    Attributes:
+        generation: Generation of the collection.  Bumped on every update.
+        codec: Name of the codec the base snapshot is encoded with.
+        base: Digest of the base snapshot the deltas apply to.
+        deltas: Changes of the collection since the base snapshot.
+
+    """
+
+    generation: int = 0
+    codec: str | None = None
+    base: str | None = None
+    deltas: list[CollectionDelta] = field(default_factory=list)
+
+    def size(self) -> int:
+        """Return the total number of changed relations in the deltas."""
+        return sum(len(delta) for delta in self.deltas)
+
+    @classmethod
+    def from_dict(cls, dct: dict[str, Any]) -> CollectionLog:
+        """Create a log from its dict representation."""
+        return cls(
+            generation=dct["generation"],
+            codec=dct["codec"],
+            base=dct["base"],
+            deltas=[CollectionDelta.from_dict(d) for d in dct["deltas"]],
+        )
+
+    def asdict(self) -> dict[str, Any]:
+        """Return a dict representation of the log that can be stored in
+        the data cache."""
+        return {
+            "generation": self.generation,
+            "codec": self.codec,
+            "base": self.base,
+            "deltas": [delta.asdict() for delta in self.deltas],
+        }
@@ -0,0 +1,177 @@
+"""Process-local cache of knowledge base lookups.
+
+Documenting a computation in the knowledge base requires looking up the
+restrictions of the computation class and the individuals of the
+restricted classes.  Against a large ontology these lookups are slow
+graph scans or SPARQL queries, while their results rarely change.
+
+The results are cached keyed on the identity of the triplestore, the
+class IRI and the restricted property.  Entries expire after `ttl`
+seconds and the least recently used entries are dropped when the cache
+is full.  Entries are invalidated by `RestrictionCache.invalidate()`
+when triples that may change their result are written to the
+triplestore.  Triples describing individuals created by the writer
+itself are ignored, since they should not be related to the individuals
+they are created from.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Iterable
+    from typing import Any
+
+    from tripper import Triplestore
+
+    Key = tuple[int, str, str]
+
+
+@dataclass
+class RestrictionEntry:
+    """Cached individuals related to a class via restrictions."""
+
+    ts: weakref.ref
+    class_iri: str
+    individuals: list[tuple[str, str, str | None]]
+    expires: float
+
+    def depends_on(self, triple: tuple[Any, Any, Any]) -> bool:
+        """Return whether writing `triple` may change this entry.
+
+        This is the case if `triple` describes the class itself, or
+        declares a new individual of one of the restricted classes.
+        """
+        # Import here to avoid a hard dependency on tripper.
+        from tripper import RDF
+
+        s, p, o = triple
+        if s == self.class_iri:
+            return True
+        return p == RDF.type and any(o == cls for _, cls, _ in self.individuals)
+
+
+class RestrictionCache:
+    """Least-recently-used cache with expiry of class restrictions and
+    the individuals of the restricted classes.
+
+    Arguments:
+        maxsize: Maximum number of entries to keep in the cache.
+        ttl: Number of seconds before an entry expires.
+
+    """
+
+    def __init__(self, maxsize: int = 128, ttl: float = 300.0) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[Key, RestrictionEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(
+        self, ts: Triplestore, class_iri: str, prop: str
+    ) -> list[tuple[str, str, str | None]] | None:
+        """Return the cached individuals or None if there is no valid
+        entry."""
+        key = (id(ts), class_iri, prop)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.ts() is not ts or entry.expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry.individuals
+
+    def add(
+        self,
+        ts: Triplestore,
+        class_iri: str,
+        prop: str,
+        individuals: list[tuple[str, str, str | None]],
+    ) -> None:
+        """Cache `individuals`."""
+        key = (id(ts), class_iri, prop)
+        entry = RestrictionEntry(
+            ts=weakref.ref(ts),
+            class_iri=class_iri,
+            individuals=individuals,
+            expires=time.monotonic() + self.ttl,
+        )
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(
+        self,
+        ts: Triplestore,
+        triples: Iterable[tuple[Any, Any, Any]],
+        created: Iterable[str] = (),
+    ) -> None:
+        """Remove the entries for `ts` that may be changed by writing
+        `triples` to it.
+
+        Triples with one of the new individuals in `created` as subject
+        are ignored.
+        """
+        skip = set(created)
+        triples = [triple for triple in triples if triple[0] not in skip]
+        with self._lock:
+            stale = [
+                key
+                for key, entry in self._entries.items()
+                if key[0] == id(ts)
+                and any(entry.depends_on(triple) for triple in triples)
+            ]
+            for key in stale:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        """Remove all entries from the cache."""
+        with self._lock:
+            self._entries.clear()
+
+
+# Cache used by restriction_individuals()
+RESTRICTION_CACHE = RestrictionCache()
+
+
+def restriction_individuals(
+    ts: Triplestore, class_iri: str, prop: str
+) -> list[tuple[str, str, str | None]]:
+    """Return the individuals related to `class_iri` via restrictions on
+    `prop`.
+
+    Returns:
+        List of `(property, restricted_class, individual)` tuples, where
+        `property` is the restricted property, `restricted_class` is the
+        value of the restriction and `individual` is the individual of
+        `restricted_class` in `ts`, or None if there is no such
+        individual.  The result is cached in `RESTRICTION_CACHE`.
+    """
+    # Import here to avoid a hard dependency on tripper.
+    from tripper import RDF
+
+    individuals = RESTRICTION_CACHE.get(ts, class_iri, prop)
+    if individuals is None:
+        individuals = [
+            (
+                r["property"],
+                r["value"],
+                ts.value(predicate=RDF.type, object=r["value"], default=None),
+            )
+            for r in ts.restrictions(class_iri, prop)
+        ]
+        RESTRICTION_CACHE.add(ts, class_iri, prop, individuals)
+    return individuals
@@ -5,30 +5,104 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 import numpy as np
+from numpy.ma import mrecords
 
 if TYPE_CHECKING:  # pragma: no cover
     from collections.abc import Sequence
     from typing import Any
 
 
+NoneType = type(None)
+NUMBER_TYPES = (bool, int, float, complex, np.number, np.bool_)
+STRING_TYPES = (str, bytes, np.str_, np.bytes_)
+INT64 = np.iinfo(np.int64)
+
+
 def dict2recarray(
-    excel_dict: dict[str, Any], names: Sequence[str] | None = None
-) -> np.recarray:
+    excel_dict: dict[str, Any],
+    names: Sequence[str] | None = None,
+    masked: bool = False,
+) -> np.recarray | mrecords.MaskedRecords:
     """Converts a dict returned by the Excel parser to a numpy rec array.
 
     If `names` is None, the record names are inferred from `excel_dict`.
+
+    See `column2array()` for how the columns are converted.  If `masked`
+    is true, a masked record array is returned.
     """
-    arrays = []
-    for arr in excel_dict.values():
-        if all(
-            isinstance(v, (bool, int, float, complex, None.__class__))
-            for v in arr
-        ):
-            arrays.append([np.nan if v is None else v for v in arr])
-        elif all(isinstance(v, (str, bytes, None.__class__)) for v in arr):
-            arrays.append(["" if v is None else v for v in arr])
-        else:
-            arrays.append(arr)
-        if names is None:
-            names = list(excel_dict.keys())
+    arrays: list[Any] = [
+        column2array(values, masked=masked) for values in excel_dict.values()
+    ]
+    if names is None:
+        names = list(excel_dict.keys())
+    if masked:
+        return mrecords.fromarrays(arrays, names=names)
     return np.rec.fromarrays(arrays, names=names)
+
+
+def column2array(
+    values: Sequence[Any], masked: bool = False
+) -> np.ndarray | Sequence[Any]:
+    """Converts a column of values returned by the Excel parser to an array.
+
+    The dtype is inferred from the set of value types in the column,
+    which is found in a single pass.  Missing values (None) are replaced
+    with NaN in numerical columns and with an empty string in string
+    columns.  Columns with other types of values are returned unchanged.
+    Integer columns with values that do not fit into int64 are returned
+    as object arrays, with missing values replaced with NaN.
+
+    If `masked` is true, numerical and string columns with missing values
+    are returned as masked arrays, with the missing values masked.  This
+    preserves the dtype of integer and boolean columns, which otherwise
+    are converted to float to represent missing values as NaN.
+    """
+    kinds = set(map(type, values))
+    has_none = NoneType in kinds
+    kinds.discard(NoneType)
+
+    if all(issubclass(kind, NUMBER_TYPES) for kind in kinds):
+        dtype = np.result_type(*kinds) if kinds else np.dtype(np.float64)
+        try:
+            if not has_none:
+                return np.asarray(values, dtype=dtype)
+            if masked:
+                data, mask = _fill_missing(values, False)
+                return np.ma.MaskedArray(data.astype(dtype), mask=mask)
+            if dtype.kind in "iu":
+                # Converting to float would silently lose the precision of
+                # integers that do not fit into int64
+                ints = [value for value in values if value is not None]
+                if max(ints) > INT64.max or min(ints) < INT64.min:
+                    raise OverflowError("integer too large for int64")
+            # NumPy converts None to NaN for floating point dtypes
+            return np.array(values, dtype=np.result_type(dtype, np.float64))
+        except OverflowError:
+            # Python integers too large for int64 are kept as objects
+            data, mask = _fill_missing(values, np.nan)
+            return np.ma.MaskedArray(data, mask=mask) if masked else data
+
+    if all(issubclass(kind, STRING_TYPES) for kind in kinds):
+        if not has_none:
+            return np.asarray(values)
+        data, mask = _fill_missing(values, "")
+        if any(issubclass(kind, bytes) for kind in kinds):
+            data = np.asarray(data.tolist())
+        else:
+            data = data.astype(str)
+        if masked:
+            return np.ma.MaskedArray(data, mask=mask)
+        return data
+
+    return values
+
+
+def _fill_missing(
+    values: Sequence[Any], fill_value: Any
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return an object array with missing values in `values` replaced with
+    `fill_value` and a boolean mask of the missing values."""
+    data = np.array(values, dtype=object)
+    mask = np.equal(data, None)  # type: ignore[call-overload]
+    data[mask] = fill_value
+    return data, mask
@@ -0,0 +1,176 @@
+"""Process-local registry of live DLite collections.
+
+The registry allows `get_collection()` to hand back the live
+`dlite.Collection` object when all strategies in a pipeline are
+executed in the same Python interpreter, instead of deserialising the
+collection from the data cache on every call.
+
+Collections are held by weak references, and only a few of the most
+recently used collections are kept alive by the registry.  Hence, the
+registry does not pin large collections in a long-running service.
+
+Each registered collection is tagged with a generation number.  The
+generation is bumped and stored in the log of the collection in the
+data cache by `update_collection()`, such that a registered collection
+that has been updated by another interpreter is detected as stale.
+
+Optionally, the relations of the collection as stored in the data
+cache can be registered together with the collection.  They are used
+by `update_collection()` as the base for incremental updates.
+"""
+
+from __future__ import annotations
+
+import threading
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no cover
+    import dlite
+
+    from oteapi_dlite.utils.delta import Relation
+
+
+@dataclass
+class RegistryEntry:
+    """A registered collection."""
+
+    ref: weakref.ref
+    generation: int
+    relations: frozenset[Relation] | None
+
+
+class CollectionRegistry:
+    """Registry of live DLite collections.
+
+    Collections are keyed by their UUID and held by weak references,
+    such that registered collections are not kept alive by the registry.
+    In addition, strong references to the `maxsize` most recently used
+    collections are kept, such that they survive between the strategies
+    of a pipeline.
+
+    Arguments:
+        maxsize: Maximum number of collections to keep strong references
+            to.
+
+    """
+
+    def __init__(self, maxsize: int = 4) -> None:
+        self.maxsize = maxsize
+        self._entries: dict[str, RegistryEntry] = {}
+        self._recent: OrderedDict[str, dlite.Collection] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, collection_id: str) -> bool:
+        return self._live(collection_id) is not None
+
+    def __len__(self) -> int:
+        return sum(1 for uuid in list(self._entries) if uuid in self)
+
+    def _live(self, collection_id: str) -> RegistryEntry | None:
+        """Return the entry of a registered collection that is still
+        alive or None."""
+        entry = self._entries.get(collection_id)
+        if entry is None or entry.ref() is None:
+            return None
+        return entry
+
+    def get(
+        self, collection_id: str, generation: int
+    ) -> dlite.Collection | None:
+        """Return the registered collection with the given UUID.
+
+        Arguments:
+            collection_id: UUID of the collection to return.
+            generation: The current generation of the collection, as
+                stored in the data cache.
+
+        Returns:
+            The live collection or None if it is not registered, no
+            longer alive or if the registered collection is stale, i.e.
+            its generation differs from `generation`.  Stale and dead
+            collections are removed from the registry.
+
+        """
+        with self._lock:
+            entry = self._entries.get(collection_id)
+            if entry is None:
+                return None
+            coll = entry.ref()
+            if coll is None or entry.generation != generation:
+                self._remove(collection_id)
+                return None
+            self._touch(coll)
+            return coll
+
+    def generation(self, collection_id: str) -> int | None:
+        """Return the generation of a registered collection or None if
+        the collection is not registered."""
+        entry = self._live(collection_id)
+        return None if entry is None else entry.generation
+
+    def relations(self, collection_id: str) -> frozenset[Relation] | None:
+        """Return the relations of a registered collection as stored in
+        the data cache.
+
+        Returns None if the collection is not registered or if its
+        stored relations are unknown.
+        """
+        entry = self._live(collection_id)
+        return None if entry is None else entry.relations
+
+    def add(
+        self,
+        collection: dlite.Collection,
+        generation: int,
+        relations: frozenset[Relation] | None = None,
+    ) -> None:
+        """Register a live collection with the given generation.
+
+        An already registered collection with the same UUID is replaced.
+
+        Arguments:
+            collection: The collection to register.
+            generation: The generation of the collection.
+            relations: The relations of the collection as stored in
+                the data cache, if known.
+
+        """
+        with self._lock:
+            for uuid in [
+                u for u, e in self._entries.items() if e.ref() is None
+            ]:
+                del self._entries[uuid]
+            self._entries[collection.uuid] = RegistryEntry(
+                weakref.ref(collection), generation, relations
+            )
+            self._touch(collection)
+
+    def discard(self, collection_id: str) -> None:
+        """Remove collection from the registry if it is registered."""
+        with self._lock:
+            self._remove(collection_id)
+
+    def clear(self) -> None:
+        """Remove all collections from the registry."""
+        with self._lock:
+            self._entries.clear()
+            self._recent.clear()
+
+    def _touch(self, collection: dlite.Collection) -> None:
+        """Mark `collection` as most recently used."""
+        self._recent[collection.uuid] = collection
+        self._recent.move_to_end(collection.uuid)
+        while len(self._recent) > self.maxsize:
+            self._recent.popitem(last=False)
+
+    def _remove(self, collection_id: str) -> None:
+        """Remove collection from the registry."""
+        self._entries.pop(collection_id, None)
+        self._recent.pop(collection_id, None)
+
+
+# Registry used by get_collection() and update_collection()
+COLLECTION_REGISTRY = CollectionRegistry()
@@ -0,0 +1,525 @@
+"""Process-local cache of mapping plans.
+
+Finding the mapping routes for instantiating a datamodel from the
+instances in a collection requires a search through the whole mapping
+graph for every property of the datamodel.  The routes only depend on
+the mappings, the datamodel to instantiate and the properties of the
+source instances, not on the source values.
+
+A `MappingPlan` holds the mapping routes for instantiating a datamodel
+from a given set of source properties.  The source values are looked up
+when the plan is executed, such that the same plan can be reused for
+new source values.  Plans are cached keyed on a hash of the mapping
+triples, the URI of the datamodel and the IRIs of the source
+properties.
+
+`MappingPlan.instantiate_many()` executes a plan for many groups of
+source instances in one call.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict, defaultdict
+from typing import TYPE_CHECKING
+
+import dlite
+import numpy as np
+from dlite.mappings import (
+    InsufficientMappingError,
+    MappingStep,
+    MissingRelationError,
+    Quantity,
+    UnknownUnitError,
+    infer_dimensions,
+    instantiate_from_routes,
+    mapping_routes,
+)
+
+from oteapi_dlite.utils.delta import relation_set
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Hashable, Iterable, Sequence
+    from typing import Any
+
+    from tripper import Triplestore
+
+
+def mapping_hash(collection: dlite.Collection) -> str:
+    """Return a hash of the mapping triples in `collection`.
+
+    The relations describing the instances in the collection (with a
+    predicate starting with an underscore) are not included, such that
+    the hash is independent of the instances in the collection.
+    """
+    triples = sorted(
+        repr(relation)
+        for relation in relation_set(collection)
+        if not relation[1].startswith("_")
+    )
+    return hashlib.sha256("\n".join(triples).encode()).hexdigest()
+
+
+def source_values(
+    instances: Sequence[dlite.Instance], quantity: type = Quantity
+) -> dict[str, Any]:
+    """Return a dict mapping source property IRIs to values.
+
+    Values of properties with a unit are returned as quantities.
+    """
+    sources = {}
+    for inst in instances:
+        props = {prop.name: prop for prop in inst.meta["properties"]}
+        for key, value in inst.properties.items():
+            iri = f"{inst.meta.uri}#{key}"
+            unit = props[key].unit
+            if unit:
+                try:
+                    sources[iri] = quantity(value, unit)
+                except TypeError as exc:
+                    raise UnknownUnitError(
+                        f"unknown unit '{unit}' in datamodel: {inst.meta.uri}"
+                    ) from exc
+            else:
+                sources[iri] = value
+    return sources
+
+
+class MappingPlan:
+    """Mapping routes for instantiating a datamodel from a given set of
+    source properties.
+
+    Arguments:
+        meta: Metadata to instantiate.
+        source_iris: IRIs of the source properties.
+        triplestore: Triplestore with the mappings.
+        allow_incomplete: Whether to allow not populating all properties
+            of the instantiated instances.
+        kwargs: Additional arguments passed to `mapping_routes()`.
+
+    """
+
+    def __init__(
+        self,
+        meta: str | dlite.Metadata,
+        source_iris: Iterable[str],
+        triplestore: Triplestore,
+        allow_incomplete: bool = False,
+        **kwargs,
+    ) -> None:
+        self.meta = dlite.get_instance(meta) if isinstance(meta, str) else meta
+        self.source_iris = frozenset(source_iris)
+        self._values: dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._vectorisable_props: list[str] | None = None
+
+        # The source values are looked up in `self._values` when the
+        # routes are evaluated
+        sources = {iri: self._lookup(iri) for iri in self.source_iris}
+        self.routes: dict[str, MappingStep] = {}
+        for prop in self.meta["properties"]:
+            target = f"{self.meta.uri}#{prop.name}"
+            try:
+                route = mapping_routes(target, sources, triplestore, **kwargs)
+            except MissingRelationError:
+                if allow_incomplete:
+                    continue
+                raise
+            if not allow_incomplete and not route.number_of_routes():
+                raise InsufficientMappingError(f"No mappings for {target}")
+            self.routes[prop.name] = route
+
+        # Source properties used by the routes
+        used: set[str] = set()
+        for step in self.routes.values():
+            used.update(route_sources(step))
+        self.used_iris = self.source_iris.intersection(used)
+
+    @property
+    def source_metas(self) -> frozenset[str]:
+        """URIs of the source datamodels used by the routes."""
+        return frozenset(iri.rpartition("#")[0] for iri in self.used_iris)
+
+    def _vectorisable(self) -> list[str]:
+        """Return names of properties whose mapping routes contain no
+        mapping functions."""
+        if self._vectorisable_props is None:
+            self._vectorisable_props = [
+                name
+                for name, step in self.routes.items()
+                if not has_functions(step)
+            ]
+        return self._vectorisable_props
+
+    def _lookup(self, iri: str) -> Any:
+        """Return a callable returning the current value of source `iri`."""
+        return lambda: self._values[iri]
+
+    def instantiate(
+        self,
+        instances: Sequence[dlite.Instance],
+        routedict: dict[str, int] | None = None,
+        id: str | None = None,
+        default: dlite.Instance | None = None,
+        quantity: type = Quantity,
+    ) -> dlite.Instance:
+        """Create a new instance populated from the values of `instances`.
+
+        Arguments:
+            instances: Source instances.  They must provide all the
+                source properties used by the routes of the plan.
+            routedict: Dict mapping property names to route number to
+                select for the given property.  The default is to select
+                the route with lowest cost.
+            id: URI of instance to create.
+            default: A dlite instance with default values for unassigned
+                properties.
+            quantity: Class implementing quantities with units.
+
+        Returns:
+            New instance.
+
+        """
+        values = source_values(instances, quantity=quantity)
+        missing = self.used_iris.difference(values)
+        if missing:
+            raise MissingRelationError(
+                f"missing source properties: {', '.join(sorted(missing))}"
+            )
+        with self._lock:
+            self._values.update(values)
+            try:
+                return instantiate_from_routes(
+                    meta=self.meta,
+                    routes=self.routes,
+                    routedict=routedict,
+                    id=id,
+                    default=default,
+                    quantity=quantity,
+                )
+            finally:
+                self._values.clear()
+
+    def instantiate_many(
+        self,
+        groups: Sequence[Sequence[dlite.Instance]],
+        routedict: dict[str, int] | None = None,
+        ids: Sequence[str | None] | None = None,
+        default: dlite.Instance | None = None,
+        quantity: type = Quantity,
+    ) -> list[dlite.Instance]:
+        """Create one new instance for each group of source instances.
+
+        Properties whose mapping routes contain no mapping functions are
+        evaluated once for all groups, by stacking the source values of
+        all groups into arrays.  Hence, unit conversions are vectorised
+        with NumPy.  Other properties are evaluated group by group.
+
+        Arguments:
+            groups: Sequence of groups of source instances.  Each group
+                must provide all the source properties used by the routes
+                of the plan.
+            routedict: Dict mapping property names to route number to
+                select for the given property.  The default is to select
+                the route with lowest cost.
+            ids: URIs of the instances to create, one per group.
+            default: A dlite instance with default values for unassigned
+                properties.
+            quantity: Class implementing quantities with units.
+
+        Returns:
+            List of new instances, one per group.
+
+        """
+        if routedict is None:
+            routedict = {}
+        if ids is None:
+            ids = [None] * len(groups)
+        if len(ids) != len(groups):
+            raise ValueError(
+                f"length of `ids` (={len(ids)}) doesn't match number of "
+                f"groups (={len(groups)})"
+            )
+
+        grouped_values = [
+            source_values(group, quantity=quantity) for group in groups
+        ]
+        for values in grouped_values:
+            missing = self.used_iris.difference(values)
+            if missing:
+                raise MissingRelationError(
+                    f"missing source properties: {', '.join(sorted(missing))}"
+                )
+
+        propdicts: list[dict[str, Any]] = [{} for _ in groups]
+        with self._lock:
+            try:
+                # Evaluate the properties that can be vectorised
+                stacked = stack_values(grouped_values, quantity=quantity)
+                if stacked is not None:
+                    self._values.update(stacked)
+                    for name in self._vectorisable():
+                        prop = self.meta.getprop(name)
+                        try:
+                            value = self.routes[name].eval(
+                                routeno=routedict.get(name),
+                                unit=prop.unit,
+                                quantity=quantity,
+                            )
+                        except MissingRelationError:
+                            continue
+                        if np.shape(value)[:1] != (len(groups),):
+                            continue
+                        for propdict, item in zip(
+                            propdicts, value, strict=True
+                        ):
+                            propdict[name] = item
+
+                # Evaluate the remaining properties group by group
+                for values, propdict in zip(
+                    grouped_values, propdicts, strict=True
+                ):
+                    self._values.clear()
+                    self._values.update(values)
+                    for prop in self.meta["properties"]:
+                        if prop.name in propdict:
+                            continue
+                        if prop.name in self.routes:
+                            try:
+                                propdict[prop.name] = self.routes[
+                                    prop.name
+                                ].eval(
+                                    routeno=routedict.get(prop.name),
+                                    unit=prop.unit,
+                                    quantity=quantity,
+                                )
+                            except MissingRelationError:
+                                if not default:
+                                    raise
+                                propdict[prop.name] = default[prop.name]
+                        elif default:
+                            propdict[prop.name] = default[prop.name]
+            finally:
+                self._values.clear()
+
+        instances = []
+        for propdict, inst_id in zip(propdicts, ids, strict=True):
+            dimensions = infer_dimensions(self.meta, propdict)
+            inst = self.meta(dimensions=dimensions, id=inst_id)
+            for key, value in propdict.items():
+                inst[key] = value
+            instances.append(inst)
+        return instances
+
+
+def has_functions(step: MappingStep | Any) -> bool:
+    """Return whether any of the mapping routes to `step` contains a
+    mapping function.  Leaf values are not mapping steps and have no
+    functions."""
+    if not isinstance(step, MappingStep):
+        return False
+    if step.function is not None:
+        return True
+    return any(
+        has_functions(value)
+        for inputs in step.input_routes
+        for value in inputs.values()
+    )
+
+
+def route_sources(step: MappingStep | Any) -> set[str]:
+    """Return the IRIs of the source values in the mapping routes to
+    `step`."""
+    if not isinstance(step, MappingStep):
+        iri = getattr(step, "output_iri", None)
+        return {iri} if iri else set()
+    return {
+        iri
+        for inputs in step.input_routes
+        for value in inputs.values()
+        for iri in route_sources(value)
+    }
+
+
+def group_instances(
+    instances: Iterable[dlite.Instance],
+    metas: Iterable[str] | None = None,
+) -> list[list[dlite.Instance]]:
+    """Group source instances for batch instantiation.
+
+    Datamodels with a single instance contribute that instance to all
+    groups.  Datamodels with several instances contribute one instance
+    to each group, in order.  All datamodels with several instances must
+    have the same number of instances.
+
+    If `metas` is given, only instances of the datamodels with these URIs
+    are grouped.  Typically the source datamodels used by a mapping plan
+    (see `MappingPlan.source_metas`), such that unrelated datamodels with
+    a different number of instances are ignored.
+
+    Returns:
+        List of groups of source instances.
+
+    """
+    selected = set(metas) if metas is not None else None
+    bymeta: dict[str, list[dlite.Instance]] = defaultdict(list)
+    for inst in instances:
+        if selected is None or inst.meta.uri in selected:
+            bymeta[inst.meta.uri].append(inst)
+
+    counts = {len(insts) for insts in bymeta.values() if len(insts) > 1}
+    if len(counts) > 1:
+        raise ValueError(
+            "inconsistent number of source instances per datamodel: "
+            + ", ".join(
+                f"{uri} (={len(insts)})" for uri, insts in bymeta.items()
+            )
+        )
+    ngroups = counts.pop() if counts else 1
+    return [
+        [insts[i] if len(insts) > 1 else insts[0] for insts in bymeta.values()]
+        for i in range(ngroups)
+    ]
+
+
+def stack_values(
+    grouped_values: Sequence[dict[str, Any]], quantity: type = Quantity
+) -> dict[str, Any] | None:
+    """Stack the source values of several groups into arrays.
+
+    Arguments:
+        grouped_values: Sequence of dicts mapping source property IRIs to
+            values, as returned by `source_values()`.
+        quantity: Class implementing quantities with units.
+
+    Returns:
+        Dict mapping source property IRIs to stacked values, with the
+        group as the first axis.  None is returned if the values of a
+        source property have different shapes or units in different
+        groups.
+
+    """
+    collected: dict[str, list[Any]] = defaultdict(list)
+    units: dict[str, Any] = {}
+    for values in grouped_values:
+        for iri, value in values.items():
+            unit = getattr(value, "units", None)
+            if units.setdefault(iri, unit) != unit:
+                return None
+            collected[iri].append(getattr(value, "magnitude", value))
+
+    stacked = {}
+    for iri, magnitudes in collected.items():
+        if len({np.shape(m) for m in magnitudes}) > 1:
+            return None
+        array = np.asarray(magnitudes)
+        unit = units[iri]
+        stacked[iri] = array if unit is None else quantity(array, unit)
+    return stacked
+
+
+class PlanCache:
+    """Least-recently-used cache of mapping plans.
+
+    Arguments:
+        maxsize: Maximum number of plans to keep in the cache.
+
+    """
+
+    def __init__(self, maxsize: int = 64) -> None:
+        self.maxsize = maxsize
+        self._plans: OrderedDict[Hashable, MappingPlan] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._plans
+
+    def __len__(self) -> int:
+        return len(self._plans)
+
+    def get(self, key: Hashable) -> MappingPlan | None:
+        """Return the plan cached under `key` or None if there is none."""
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is not None:
+                self._plans.move_to_end(key)
+            return plan
+
+    def add(self, key: Hashable, plan: MappingPlan) -> None:
+        """Cache `plan` under `key`."""
+        with self._lock:
+            self._plans[key] = plan
+            self._plans.move_to_end(key)
+            while len(self._plans) > self.maxsize:
+                self._plans.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all plans from the cache."""
+        with self._lock:
+            self._plans.clear()
+
+
+# Cache used by get_mapping_plan()
+PLAN_CACHE = PlanCache()
+
+
+def get_mapping_plan(
+    meta: str | dlite.Metadata,
+    instances: Sequence[dlite.Instance],
+    collection: dlite.Collection,
+    allow_incomplete: bool = False,
+    **kwargs,
+) -> MappingPlan:
+    """Return a mapping plan for instantiating `meta` from `instances`
+    using the mappings in `collection`.
+
+    The plan is reused from the cache if the mappings, the metadata and
+    the properties of `instances` are the same as for a cached plan.
+    Plans are not cached if `kwargs` contains unhashable values.
+
+    Arguments:
+        meta: Metadata to instantiate.  Typically its URI.
+        instances: Source instances.
+        collection: Collection with the mappings.
+        allow_incomplete: Whether to allow not populating all properties
+            of the instantiated instances.
+        kwargs: Additional arguments passed to `mapping_routes()`.
+
+    Returns:
+        The mapping plan.
+
+    """
+    # Import here to avoid a hard dependency on tripper.
+    from tripper import Triplestore
+
+    metauri = meta if isinstance(meta, str) else meta.uri
+    source_iris = frozenset(
+        f"{inst.meta.uri}#{name}"
+        for inst in instances
+        for name in inst.properties
+    )
+    key: Hashable | None = (
+        mapping_hash(collection),
+        metauri,
+        source_iris,
+        allow_incomplete,
+        tuple(sorted(kwargs.items())),
+    )
+    try:
+        hash(key)
+    except TypeError:
+        key = None
+
+    plan = PLAN_CACHE.get(key) if key is not None else None
+    if plan is None:
+        plan = MappingPlan(
+            meta,
+            source_iris,
+            Triplestore(backend="collection", collection=collection),
+            allow_incomplete=allow_incomplete,
+            **kwargs,
+        )
+        if key is not None:
+            PLAN_CACHE.add(key, plan)
+    return plan
@@ -0,0 +1,207 @@
+"""Process-local cache of expanded mapping triples.
+
+Mapping configurations are typically static, but may contain thousands
+of triples with prefixed IRIs.  The expanded and deduplicated triples
+are cached keyed on a hash of the namespaces used for the expansion and
+of the triples, such that repeated pipeline runs with the same mappings
+only expand the triples once.
+
+The expansion itself is done by a `PrefixExpander`, which precompiles
+the namespaces into a lookup table and memoises the expanded terms,
+such that each distinct term is only resolved once.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+from oteapi_dlite.utils.delta import relation_set
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Iterable, Mapping
+    from typing import Any
+
+    from tripper import Triplestore
+
+    Triple = tuple[Any, Any, Any]
+
+
+def triples_key(namespaces: Mapping[str, Any], triples: Iterable[Any]) -> str:
+    """Return a hash of `namespaces` and `triples`.
+
+    The hash is independent of the order of the namespaces and triples.
+    """
+    lines = sorted(f"@prefix {k}: {v}" for k, v in namespaces.items())
+    lines.extend(sorted(repr(tuple(triple)) for triple in triples))
+    return hashlib.sha256("\n".join(lines).encode()).hexdigest()
+
+
+class TriplesCache:
+    """Least-recently-used cache of expanded triples.
+
+    Arguments:
+        maxsize: Maximum number of triple sets to keep in the cache.
+
+    """
+
+    def __init__(self, maxsize: int = 32) -> None:
+        self.maxsize = maxsize
+        self._triples: OrderedDict[str, tuple[Triple, ...]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._triples
+
+    def __len__(self) -> int:
+        return len(self._triples)
+
+    def get(self, key: str) -> tuple[Triple, ...] | None:
+        """Return the triples cached under `key` or None if there is none."""
+        with self._lock:
+            triples = self._triples.get(key)
+            if triples is not None:
+                self._triples.move_to_end(key)
+            return triples
+
+    def add(self, key: str, triples: tuple[Triple, ...]) -> None:
+        """Cache `triples` under `key`."""
+        with self._lock:
+            self._triples[key] = triples
+            self._triples.move_to_end(key)
+            while len(self._triples) > self.maxsize:
+                self._triples.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all triples from the cache."""
+        with self._lock:
+            self._triples.clear()
+
+
+# Cache used by expanded_triples()
+TRIPLES_CACHE = TriplesCache()
+
+
+class PrefixExpander:
+    """Expands prefixed IRIs (CURIEs) using a precompiled lookup table.
+
+    Namespaces given as strings or as plain `tripper.Namespace` objects
+    are compiled into a dict mapping prefixes to namespace IRIs.  If any
+    namespace resolves names via label annotations or checks them, all
+    terms are expanded with `tripper.utils.expand_iri()` instead, since
+    such namespaces may also resolve full IRIs.
+
+    Expanded terms are memoised, such that each distinct term is only
+    resolved once.
+
+    Arguments:
+        namespaces: Dict mapping prefixes to namespaces.  Typically the
+            `namespaces` attribute of a triplestore.
+
+    """
+
+    def __init__(self, namespaces: Mapping[str, Any]) -> None:
+        # Import here to avoid a hard dependency on tripper.
+        from tripper.utils import MATCH_PREFIXED_IRI
+
+        self.namespaces = dict(namespaces)
+        self._match = MATCH_PREFIXED_IRI.match
+        self._lookup = {
+            prefix: str(namespace)
+            for prefix, namespace in self.namespaces.items()
+        }
+        self._resolving = any(
+            getattr(namespace, "_label_annotations", None)
+            or getattr(namespace, "_check", False)
+            for namespace in self.namespaces.values()
+        )
+        self._memo: dict[str, str] = {}
+
+    def expand(self, term: str) -> str:
+        """Return `term` expanded if it is prefixed.  Otherwise `term` is
+        returned unchanged."""
+        expanded = self._memo.get(term)
+        if expanded is None:
+            expanded = self._expand(term)
+            self._memo[term] = expanded
+        return expanded
+
+    def _expand(self, term: str) -> str:
+        """Expand `term` without memoisation."""
+        if self._resolving:
+            # Import here to avoid a hard dependency on tripper.
+            from tripper.utils import expand_iri
+
+            return expand_iri(term, self.namespaces)
+
+        match = self._match(term)
+        if match:
+            prefix, name, _ = match.groups()
+            if prefix in self._lookup:
+                return self._lookup[prefix] + name
+        return term
+
+    def expand_triples(self, triples: Iterable[Any]) -> tuple[Triple, ...]:
+        """Return `triples` with all string terms expanded.
+
+        Duplicated triples are removed, while the order of the remaining
+        triples is preserved.
+        """
+        memo_get = self._memo.get
+        expand = self.expand
+
+        def term(t: Any) -> Any:
+            return (memo_get(t) or expand(t)) if isinstance(t, str) else t
+
+        return tuple(
+            dict.fromkeys((term(s), term(p), term(o)) for s, p, o in triples)
+        )
+
+
+def expanded_triples(
+    ts: Triplestore,
+    triples: Iterable[Any],
+    prefixes: Mapping[str, Any] | None = None,
+) -> tuple[Triple, ...]:
+    """Return `triples` with all string terms expanded using the
+    namespaces bound to `ts`.
+
+    Duplicated triples are removed, while the order of the remaining
+    triples is preserved.  The result is cached in `TRIPLES_CACHE`.
+
+    Arguments:
+        ts: Triplestore providing the namespaces.
+        triples: Triples to expand.
+        prefixes: Dict mapping additional prefixes to namespace IRIs.
+            They take precedence over the namespaces of `ts`, but are
+            only used for this expansion and not bound to `ts`.  Hence
+            it is safe to use with triplestores shared between pipelines.
+
+    """
+    namespaces = {**ts.namespaces, **(prefixes or {})}
+    triples = list(triples)
+    key = triples_key(namespaces, triples)
+    expanded = TRIPLES_CACHE.get(key)
+    if expanded is None:
+        expanded = PrefixExpander(namespaces).expand_triples(triples)
+        TRIPLES_CACHE.add(key, expanded)
+    return expanded
+
+
+def missing_triples(ts: Triplestore, triples: Iterable[Triple]) -> list[Triple]:
+    """Return the triples in `triples` that are not already in `ts`.
+
+    Only triplestores with the collection backend are checked, since
+    their relations can be listed cheaply.  For other backends all
+    `triples` are returned.
+    """
+    if ts.backend_name != "collection":
+        return list(triples)
+    existing = {
+        (s, p, o)
+        for s, p, o, d in relation_set(ts.backend.collection)
+        if d is None
+    }
+    return [triple for triple in triples if triple not in existing]
@@ -0,0 +1,245 @@
+"""Process-local pool of live triplestores.
+
+Creating a triplestore from the `tripper.triplestore` setting may be
+expensive.  For example, a triplestore with the rdflib backend parses
+the whole knowledge base file when it is created.  The pool keeps the
+triplestores alive between pipeline runs, keyed on the normalised
+settings, such that strategies documenting data in the knowledge base
+reuse an already loaded graph.
+
+A triplestore is acquired from the pool with `acquire()` and handed
+back with `release()`.  Only one thread at a time may use a pooled
+triplestore.  Its content is only written back to persistent storage
+when it is released after being written to.  Triplestores that have
+been idle for longer than `max_idle` seconds are closed and removed
+from the pool when a triplestore is acquired or released.
+
+Triplestores backed by a local file (like rdflib with a
+`triplestore_url`) may be changed by other processes.  The modification
+time of the file is therefore recorded when it is loaded or written.
+If the file has been modified since, a pooled triplestore is reloaded
+before it is reused, and the file is merged into the triplestore
+before it is overwritten.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING
+from urllib.parse import unquote, urlparse
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Any
+
+    from tripper import Triplestore
+
+
+def kb_settings_key(kb_settings: dict[str, Any]) -> str | None:
+    """Return a normalised key for `kb_settings`.
+
+    The key is independent of the order of the settings.  None is
+    returned if the settings cannot be serialised to JSON, in which case
+    the triplestore should not be pooled.
+    """
+    try:
+        return json.dumps(kb_settings, sort_keys=True)
+    except TypeError:
+        return None
+
+
+def storage_mtime(ts: Triplestore) -> int | None:
+    """Return the modification time in nanoseconds of the local file
+    backing `ts`.
+
+    None is returned if `ts` is not backed by a local file or if the
+    file does not exist.
+    """
+    url = getattr(ts.backend, "triplestore_url", None)
+    if not url:
+        return None
+    location = str(url)
+    if location.startswith("file:"):
+        location = unquote(urlparse(location).path)
+    elif "://" in location:
+        return None
+    try:
+        return Path(location).stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def flush_triplestore(ts: Triplestore, mtime: int | None = None) -> None:
+    """Write the content of `ts` to persistent storage, without closing it.
+
+    Backends that implement a `flush()` method are flushed with it.  For
+    backends that hold a graph parsed from a file (like rdflib with a
+    `triplestore_url`), the graph is serialised back to the file.  If
+    `mtime` is given and the file has been modified since, the file is
+    first parsed into `ts`, such that triples added by others are not
+    lost.  For other backends this function has no effect.
+    """
+    backend = ts.backend
+    if hasattr(backend, "flush"):
+        backend.flush()
+    elif getattr(backend, "triplestore_url", None) and hasattr(
+        backend, "serialize"
+    ):
+        fmt = getattr(backend, "base_format", None)
+        if mtime is not None and storage_mtime(ts) != mtime:
+            ts.parse(backend.triplestore_url, format=fmt)
+        backend.serialize(destination=backend.triplestore_url, format=fmt)
+
+
+def discard_triplestore(ts: Triplestore) -> None:
+    """Close `ts` without writing its content back to storage.
+
+    The rdflib backend serialises its graph to `triplestore_url` when it
+    is closed, which would overwrite changes made to the file by others.
+    For such backends the graph is closed directly.  Other backends are
+    closed as usual.
+    """
+    backend = ts.backend
+    if getattr(backend, "triplestore_url", None) and hasattr(backend, "graph"):
+        if not ts.closed:
+            backend.graph.close()
+        ts.closed = True
+    else:
+        ts.close()
+
+
+@dataclass
+class PoolEntry:
+    """A triplestore in the pool."""
+
+    ts: Triplestore
+    lock: threading.RLock = field(default_factory=threading.RLock)
+    users: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+    mtime: int | None = None
+
+
+class TriplestorePool:
+    """Keyed pool of live triplestores.
+
+    Arguments:
+        max_idle: Number of seconds a triplestore may be unused before it
+            is closed and removed from the pool.
+
+    """
+
+    def __init__(self, max_idle: float = 600.0) -> None:
+        self.max_idle = max_idle
+        self._entries: dict[str, PoolEntry] = {}
+        self._keys: dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, kb_settings: dict[str, Any]) -> bool:
+        return kb_settings_key(kb_settings) in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def acquire(self, kb_settings: dict[str, Any]) -> Triplestore:
+        """Return a live triplestore for `kb_settings`.
+
+        The triplestore is created if it is not in the pool.  The calling
+        thread has exclusive use of it until it is handed back with
+        `release()`.  Settings that cannot be normalised give a new
+        triplestore that is not pooled.
+        """
+        # Import here to avoid a hard dependency on tripper.
+        from tripper import Triplestore
+
+        self.evict_idle()
+        key = kb_settings_key(kb_settings)
+        if key is None:
+            return Triplestore(**kb_settings)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.ts.closed:
+                entry = self._add(key, Triplestore(**kb_settings))
+            entry.users += 1
+
+        entry.lock.acquire()
+        if entry.mtime is not None and storage_mtime(entry.ts) != entry.mtime:
+            # The file has been modified by another process.  Reload it in
+            # place, such that threads waiting for the entry get the new
+            # triplestore.
+            stale = entry.ts
+            fresh = Triplestore(**kb_settings)
+            with self._lock:
+                self._keys.pop(id(stale), None)
+                self._keys[id(fresh)] = key
+                entry.ts, entry.mtime = fresh, storage_mtime(fresh)
+            discard_triplestore(stale)
+        return entry.ts
+
+    def release(self, ts: Triplestore, dirty: bool = False) -> None:
+        """Hand back `ts` to the pool.
+
+        If `dirty` is true, `ts` has been written to and its content is
+        written to persistent storage.  Triplestores that are not pooled
+        are closed.  Idle triplestores are evicted afterwards.
+        """
+        with self._lock:
+            key = self._keys.get(id(ts))
+            entry = self._entries.get(key) if key is not None else None
+            if entry is None or entry.ts is not ts:
+                entry = None
+            else:
+                entry.users -= 1
+                entry.last_used = time.monotonic()
+
+        if entry is None:
+            ts.close()
+        else:
+            try:
+                if dirty:
+                    flush_triplestore(ts, mtime=entry.mtime)
+                    entry.mtime = storage_mtime(ts)
+            finally:
+                entry.lock.release()
+        self.evict_idle()
+
+    def _add(self, key: str, ts: Triplestore) -> PoolEntry:
+        """Add a new entry for `ts` to the pool.  Must be called with the
+        pool lock held."""
+        entry = PoolEntry(ts, mtime=storage_mtime(ts))
+        self._entries[key] = entry
+        self._keys[id(ts)] = key
+        return entry
+
+    def evict_idle(self, now: float | None = None) -> None:
+        """Close and remove triplestores that are not in use and have been
+        idle for longer than `max_idle` seconds.
+
+        The evicted triplestores are not written back to persistent
+        storage.
+        """
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            evicted = [
+                (key, entry)
+                for key, entry in self._entries.items()
+                if not entry.users and now - entry.last_used > self.max_idle
+            ]
+            for key, entry in evicted:
+                del self._entries[key]
+                self._keys.pop(id(entry.ts), None)
+        # Any writes have already been flushed by release()
+        for _, entry in evicted:
+            discard_triplestore(entry.ts)
+
+    def clear(self) -> None:
+        """Close and remove all triplestores that are not in use."""
+        self.evict_idle(now=float("inf"))
+
+
+# Pool used by acquire_triplestore()
+TRIPLESTORE_POOL = TriplestorePool()
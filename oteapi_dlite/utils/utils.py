@@ -7,12 +7,29 @@ from pathlib import Path
 from typing import TYPE_CHECKING
 
 import dlite
-from dlite.mappings import instantiate
+from dlite.mappings import Quantity
 from oteapi.datacache import DataCache
 
+from oteapi_dlite.utils.codecs import (
+    codec_from_settings,
+    decode_any,
+    get_codec,
+)
+from oteapi_dlite.utils.delta import (
+    MAX_DELTAS,
+    CollectionDelta,
+    CollectionLog,
+    base_digest,
+    log_key,
+    relation_set,
+)
 from oteapi_dlite.utils.exceptions import CollectionNotFound
+from oteapi_dlite.utils.registry import COLLECTION_REGISTRY
+from oteapi_dlite.utils.routes import get_mapping_plan, group_instances
+from oteapi_dlite.utils.tspool import TRIPLESTORE_POOL
 
 if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Sequence
     from typing import Any
 
     from tripper import Triplestore
@@ -49,15 +66,36 @@ ACCESSSERVICES = {
 }
 
 
-def get_collection(collection_id: str | None = None) -> dlite.Collection:
+def get_collection(
+    collection_id: str | None = None,
+    dlite_settings: dict[str, Any] | None = None,
+) -> dlite.Collection:
     """Retrieve a DLite Collection.
 
     Looks for a Collection UUID with `collection_id`.
     If none exists or `collection_id` is not given, a new, empty Collection is
     created and returned.
 
+    If the collection has been stored in the data cache by this Python
+    interpreter and not been updated by another interpreter since, the
+    live collection is returned from the collection registry instead
+    of being deserialised from the data cache.
+
+    Only the relations of the collection are loaded.  The instances
+    referred to by the collection are first looked up when they are
+    accessed, e.g. with `coll.get(label)`.  Use `get_instance_index()`
+    to access the labels, UUIDs and metadata URIs of the instances
+    without loading them.
+
+    The collection is stored in the data cache as a base snapshot and a
+    log of deltas (see `oteapi_dlite.utils.delta`).  Hence, the value
+    stored under the collection UUID is not necessarily the current
+    collection.  Always use this function to read a collection.
+
     Parameters:
         collection_id: A specific collection ID to retrieve.
+        dlite_settings: DLite settings from the session.  Used to select
+            the codec of new collections (see `update_collection()`).
 
     Return:
         A DLite Collection to be used throughout the OTEAPI pipeline run.
@@ -72,11 +110,12 @@ def get_collection(collection_id: str | None = None) -> dlite.Collection:
     # up the collection (which is the proper and scalable solution).
     if collection_id is None:
         coll = dlite.Collection()
-        cache.add(coll.asjson(), key=coll.uuid)
+        update_collection(coll, dlite_settings=dlite_settings)
     elif collection_id in cache:
-        coll = dlite.Instance.from_json(
-            cache.get(collection_id), id=collection_id
-        )
+        log = _read_log(cache, collection_id)
+        coll = COLLECTION_REGISTRY.get(collection_id, log.generation)
+        if coll is None:
+            coll = _load_collection(cache, collection_id, log)
     else:
         try:
             coll = dlite.get_instance(collection_id)
@@ -86,6 +125,7 @@ def get_collection(collection_id: str | None = None) -> dlite.Collection:
             ) from exc
 
     if coll.meta.uri != dlite.COLLECTION_ENTITY:
+        COLLECTION_REGISTRY.discard(coll.uuid)
         raise CollectionNotFound(
             f"instance with id {collection_id} is not a collection"
         )
@@ -93,14 +133,147 @@ def get_collection(collection_id: str | None = None) -> dlite.Collection:
     return coll
 
 
-def update_collection(collection: dlite.Collection) -> None:
+def update_collection(
+    collection: dlite.Collection,
+    codec: str | None = None,
+    dlite_settings: dict[str, Any] | None = None,
+) -> None:
     """Update collection in DataCache.
 
+    If the relations of the collection as stored in the data cache are
+    known from the collection registry, only the change since the last
+    update is appended to the log of the collection.  A new base
+    snapshot of the whole collection is written when the log grows
+    beyond `MAX_DELTAS` entries or when the accumulated change is large
+    compared to the collection.  Nothing is written if the collection is
+    unchanged.
+
+    The base snapshot and the log are written in a single data cache
+    transaction with the same expiry time, such that they cannot expire
+    independently of each other.
+
+    The generation of the collection is bumped and the collection is
+    registered in the collection registry, such that subsequent calls to
+    `get_collection()` in this Python interpreter return it directly.
+
+    Base snapshots are encoded with the given collection codec (see
+    `oteapi_dlite.utils.codecs`).  If `codec` is not given, the codec
+    is selected with the `oteapi_dlite.collection_codec` setting in
+    `dlite_settings`.
+
     Parameters:
         collection: The DLite Collection to be updated.
+        codec: Name of the codec used to encode the base snapshot.  The
+            default is to use the codec selected in `dlite_settings`,
+            the codec the collection is already stored with or
+            `DEFAULT_CODEC` for new collections, in that order.
+        dlite_settings: DLite settings from the session.
     """
     cache = DataCache()
-    cache.add(value=collection.asjson(), key=collection.uuid)
+    expire = cache.config.expireTime
+    uuid = collection.uuid
+    log = _read_log(cache, uuid)
+    relations = relation_set(collection)
+    if not codec:
+        codec = codec_from_settings(dlite_settings or {}) or log.codec
+
+    stored_relations = COLLECTION_REGISTRY.relations(uuid)
+    if (
+        stored_relations is not None
+        and log.base is not None
+        and codec == log.codec
+        and COLLECTION_REGISTRY.generation(uuid) == log.generation
+        and uuid in cache
+    ):
+        delta = CollectionDelta.from_relations(stored_relations, relations)
+        if not delta:
+            return
+        if len(log.deltas) < MAX_DELTAS and 2 * (
+            log.size() + len(delta)
+        ) <= len(relations):
+            log.deltas.append(delta)
+            log.generation += 1
+            with cache.diskcache.transact():
+                cache.add(value=log.asdict(), key=log_key(uuid), expire=expire)
+                cache.diskcache.touch(uuid, expire=expire)
+            COLLECTION_REGISTRY.add(collection, log.generation, relations)
+            return
+
+    # Write new base snapshot and reset the log
+    encoder = get_codec(codec)
+    value = encoder.encode(collection)
+    log = CollectionLog(
+        generation=log.generation + 1,
+        codec=encoder.name,
+        base=base_digest(value),
+    )
+    with cache.diskcache.transact():
+        cache.add(value=value, key=uuid, expire=expire)
+        cache.add(value=log.asdict(), key=log_key(uuid), expire=expire)
+    COLLECTION_REGISTRY.add(collection, log.generation, relations)
+
+
+def _read_log(cache: DataCache, collection_id: str) -> CollectionLog:
+    """Return the log of a collection stored in the data cache or an empty
+    log if there is none."""
+    key = log_key(collection_id)
+    return (
+        CollectionLog.from_dict(cache.get(key))
+        if key in cache
+        else (CollectionLog())
+    )
+
+
+def _load_collection(
+    cache: DataCache, collection_id: str, log: CollectionLog
+) -> dlite.Collection:
+    """Load collection from its base snapshot and log in the data cache
+    and register it in the collection registry.
+
+    The log is only applied if its digest matches the base snapshot.
+    Otherwise the base snapshot has been written directly to the data
+    cache and is loaded as it is.
+    """
+    # If the collection already lives in this interpreter, DLite returns
+    # the live instance and its relations may differ from those stored in
+    # the data cache.
+    resident = dlite.has_instance(collection_id)
+
+    value = cache.get(collection_id)
+    consistent = log.base is not None and log.base == base_digest(value)
+    if consistent:
+        coll = get_codec(log.codec).decode(value, collection_id)
+        for delta in log.deltas:
+            delta.apply(coll)
+    else:
+        coll = decode_any(value, collection_id)
+
+    if coll.meta.uri == dlite.COLLECTION_ENTITY:
+        # Only register the stored relations if the log is consistent,
+        # such that the next update writes a new base snapshot otherwise
+        COLLECTION_REGISTRY.add(
+            coll,
+            log.generation,
+            relation_set(coll) if consistent and not resident else None,
+        )
+    return coll
+
+
+def get_instance_index(
+    collection: dlite.Collection,
+) -> dict[str, tuple[str, str]]:
+    """Return a dict mapping the labels of the instances in `collection` to
+    `(uuid, metaURI)` tuples.
+
+    Only the relations of the collection are accessed, so no instances
+    are loaded.
+    """
+    uuids = {s: o for s, _, o in collection.get_relations(p="_has-uuid")}
+    return {
+        s: (uuids[s], o)
+        for s, _, o in collection.get_relations(p="_has-meta")
+        if s in uuids
+    }
 
 
 def get_meta(uri: str) -> dlite.Instance:
@@ -157,10 +330,10 @@ def get_instance(
             of the returned instance.
         kwargs: Additional arguments passed to dlite.mappings.instantiate().
 
+    The mapping routes are cached (see `oteapi_dlite.utils.routes`), such
+    that repeated instantiations of `meta` with the same mappings and
+    source datamodels skip the route search.
     """
-    # Import here to avoid a hard dependency on tripper.
-    from tripper import Triplestore
-
     if collection is None:
         if collection_id is None:
             raise TypeError(
@@ -169,17 +342,99 @@ def get_instance(
             )
         collection = get_collection(collection_id)
 
-    ts = Triplestore(backend="collection", collection=collection)
+    default = kwargs.pop("default", None)
+    quantity = kwargs.pop("quantity", Quantity)
+    if default:
+        allow_incomplete = True
 
-    return instantiate(
-        meta=meta,
-        instances=list(collection.get_instances()),
-        triplestore=ts,
+    instances = list(collection.get_instances())
+    plan = get_mapping_plan(
+        meta,
+        instances,
+        collection,
+        allow_incomplete=allow_incomplete,
+        **kwargs,
+    )
+    return plan.instantiate(
+        instances,
         routedict=routedict,
         id=instance_id,
+        default=default,
+        quantity=quantity,
+    )
+
+
+def get_instances(
+    meta: str | dlite.Metadata,
+    collection_id: str | None = None,
+    collection: dlite.Collection | None = None,
+    routedict: dict | None = None,
+    instance_ids: Sequence[str | None] | None = None,
+    allow_incomplete: bool = False,
+    **kwargs,
+) -> list[dlite.Instance]:
+    """Instantiates and returns several instances of `meta` in one call.
+
+    The source instances in the collection are grouped with
+    `oteapi_dlite.utils.routes.group_instances()`: datamodels with a
+    single instance are shared by all new instances, while datamodels
+    with several instances contribute one instance to each new instance.
+    Only the source datamodels used by the mapping routes are grouped.
+
+    The mapping routes are found once and shared by all new instances.
+    Properties whose mapping routes contain no mapping functions are
+    evaluated for all new instances at once, with vectorised unit
+    conversions.
+
+    Arguments:
+        meta: Metadata to instantiate.  Typically its URI.
+        collection: The collection with instances and mappings.
+            The default is to get the collection from `collection_id`.
+
+    Some less used optional arguments:
+        routedict: Dict mapping property names to route number to select for
+            the given property.  The default is to select the route with
+            lowest cost.
+        instance_ids: URIs of instances to create, one per new instance.
+        allow_incomplete: Whether to allow not populating all properties
+            of the returned instances.
+        kwargs: Additional arguments passed to dlite.mappings.instantiate().
+
+    Returns:
+        List of new instances.
+    """
+    if collection is None:
+        if collection_id is None:
+            raise TypeError(
+                "get_instances() requires that either `collection_id` or "
+                "`collection` argument is given."
+            )
+        collection = get_collection(collection_id)
+
+    default = kwargs.pop("default", None)
+    quantity = kwargs.pop("quantity", Quantity)
+    if default:
+        allow_incomplete = True
+
+    # The plan only depends on the properties of the source datamodels,
+    # so it is found from one instance of each datamodel
+    instances = list(collection.get_instances())
+    representatives = {inst.meta.uri: inst for inst in reversed(instances)}
+    plan = get_mapping_plan(
+        meta,
+        list(representatives.values()),
+        collection,
         allow_incomplete=allow_incomplete,
         **kwargs,
     )
+    groups = group_instances(instances, plan.source_metas)
+    return plan.instantiate_many(
+        groups,
+        routedict=routedict,
+        ids=instance_ids,
+        default=default,
+        quantity=quantity,
+    )
 
 
 def get_triplestore(
@@ -192,6 +447,9 @@ def get_triplestore(
     SettingsStrategy, it will be used to configure the returned
     triplestore instance.  Otherwise the provided collection ID will be
     used.
+
+    The returned triplestore is owned by the caller.  See
+    `acquire_triplestore()` for a triplestore shared between pipelines.
     """
     # Import here to avoid a hard dependency on tripper.
     from tripper import Triplestore
@@ -206,6 +464,33 @@ def get_triplestore(
     raise ValueError("Either of 'kb_settings' or 'collection_id' must be set.")
 
 
+def acquire_triplestore(
+    kb_settings: dict[str, Any] | None = None,
+    collection_id: str | None = None,
+) -> Triplestore:
+    """Like `get_triplestore()`, but triplestores configured with
+    `kb_settings` are acquired from a pool of live triplestores (see
+    `oteapi_dlite.utils.tspool`).
+
+    The calling thread has exclusive use of the returned triplestore
+    until it is handed back with `release_triplestore()`, which must
+    always be called.  The triplestore must not be closed by the caller.
+    """
+    if kb_settings:
+        return TRIPLESTORE_POOL.acquire(kb_settings)
+    return get_triplestore(collection_id=collection_id)
+
+
+def release_triplestore(ts: Triplestore, dirty: bool = False) -> None:
+    """Hand back a triplestore returned by `acquire_triplestore()`.
+
+    Pooled triplestores are kept alive for reuse.  They are flushed to
+    persistent storage if `dirty` is true, i.e. if triples have been
+    written to them.  Other triplestores are closed.
+    """
+    TRIPLESTORE_POOL.release(ts, dirty=dirty)
+
+
 class TypeMismatchError(TypeError):
     """Raised by update_dict() if there is a mismatch in value types
     between the `dct` and `update` dictionaries.
@@ -178,3 +178,260 @@ def test_keep_referred_true(
         "image2",
         "image4",
     }
+
+
+def test_filter_without_loading_instances() -> None:
+    """Test that filtering on labels and datamodels does not load the
+    instances in the collection."""
+    import dlite
+    from oteapi.utils.config_updater import populate_config_from_session
+
+    from oteapi_dlite.strategies.filter import (
+        DLiteFilterConfig,
+        DLiteFilterStrategy,
+    )
+
+    # Relations referring to instances that do not exist
+    coll = dlite.Collection()
+    for i in range(4):
+        label = f"inst{i}"
+        coll.add_relation(label, "_is-a", "Instance")
+        coll.add_relation(
+            label, "_has-uuid", f"6b4c4f4e-0000-4000-8000-00000000000{i}"
+        )
+        coll.add_relation(label, "_has-meta", "http://onto-ns.com/meta/0.1/A")
+
+    config = DLiteFilterConfig(
+        filterType="dlite/filter",
+        configuration={
+            "keep_label": "inst[02]",
+            "keep_referred": False,
+            "collection_id": coll.uuid,
+        },
+    )
+
+    session = DLiteFilterStrategy(config).initialize()
+    populate_config_from_session(session, config)
+    DLiteFilterStrategy(config).get()
+
+    assert set(coll.get_labels()) == {"inst0", "inst2"}
+
+
+def reference_select_removal(
+    instdict: dict[str, tuple[str, str]],
+    remove_label: str | None = None,
+    remove_datamodel: str | None = None,
+    keep_label: str | None = None,
+    keep_datamodel: str | None = None,
+) -> set[str]:
+    """The original matching loop of the filter strategy, for reference."""
+    import re
+
+    removal = set()
+    if remove_label or remove_datamodel:
+        for label, (_, metauri) in instdict.items():
+            if remove_label and re.match(remove_label, label):
+                removal.add(label)
+            if remove_datamodel and re.match(remove_datamodel, metauri):
+                removal.add(label)
+    else:
+        removal.update(instdict.keys())
+
+    for label in set(removal):
+        _, metauri = instdict[label]
+        if (keep_label and re.match(keep_label, label)) or (
+            keep_datamodel and re.match(keep_datamodel, metauri)
+        ):
+            removal.remove(label)
+    return removal
+
+
+def test_select_removal() -> None:
+    """Test that select_removal() agrees with the original implementation,
+    also for lists of patterns."""
+    from oteapi_dlite.strategies.filter import select_removal
+
+    instdict = {
+        f"label{i}": (f"uuid{i}", f"http://onto-ns.com/meta/0.1/Model{i % 10}")
+        for i in range(1000)
+    }
+    kwargs = {
+        "remove_label": r"label\d*7$",
+        "remove_datamodel": r".*/Model[0-4]$",
+        "keep_label": r"label1",
+        "keep_datamodel": r".*/Model3$",
+    }
+    expected = reference_select_removal(instdict, **kwargs)
+    assert select_removal(instdict, **kwargs) == expected
+
+    assert select_removal(
+        instdict,
+        remove_datamodel=[r".*/Model1$", r".*/Model2$"],
+        keep_label=[r"label1", r"label2"],
+    ) == reference_select_removal(
+        instdict, remove_datamodel=r".*/Model[12]$", keep_label=r"label[12]"
+    )
+
+
+def test_keep_referred_via_refs() -> None:
+    """Test keep_referred following ref-type properties, without loading
+    instances whose metadata has no ref-type properties."""
+    import dlite
+    from oteapi.utils.config_updater import populate_config_from_session
+
+    from oteapi_dlite.strategies.filter import (
+        DLiteFilterConfig,
+        DLiteFilterStrategy,
+    )
+
+    Node = dlite.Instance.from_dict(
+        {
+            "uri": "http://onto-ns.com/meta/0.1/FilterTestNode",
+            "description": "Node referring to other nodes.",
+            "dimensions": {"n": "Number of children."},
+            "properties": {
+                "children": {
+                    "type": "ref",
+                    "$ref": "http://onto-ns.com/meta/0.1/FilterTestNode",
+                    "shape": ["n"],
+                },
+                "next": {
+                    "type": "ref",
+                    "$ref": "http://onto-ns.com/meta/0.1/FilterTestNode",
+                },
+            },
+        }
+    )
+    leaf, child, root, orphan = Node([0]), Node([0]), Node([1]), Node([0])
+    root.children = [child]
+    child.next = leaf
+    leaf.next = root  # cyclic reference
+
+    coll = dlite.Collection()
+    for label, inst in [
+        ("root", root),
+        ("child", child),
+        ("leaf", leaf),
+        ("orphan", orphan),
+    ]:
+        coll.add(label, inst)
+
+    # Relations referring to an instance that does not exist
+    coll.add_relation("missing", "_is-a", "Instance")
+    coll.add_relation(
+        "missing", "_has-uuid", "6b4c4f4e-0000-4000-8000-000000000010"
+    )
+    coll.add_relation(
+        "missing", "_has-meta", "http://onto-ns.com/meta/1.0/Image"
+    )
+
+    config = DLiteFilterConfig(
+        filterType="dlite/filter",
+        configuration={
+            "keep_label": "root|missing",
+            "keep_referred": True,
+            "collection_id": coll.uuid,
+        },
+    )
+    session = DLiteFilterStrategy(config).initialize()
+    populate_config_from_session(session, config)
+    DLiteFilterStrategy(config).get()
+
+    assert set(coll.get_labels()) == {"root", "child", "leaf", "missing"}
+
+
+def test_dry_run(
+    initialize_collection: tuple[Collection, Instance],
+) -> None:
+    """Test dry run returning statistics without modifying the collection."""
+    from oteapi_dlite.strategies.filter import (
+        DLiteFilterConfig,
+        DLiteFilterStrategy,
+    )
+
+    coll, Image = initialize_collection
+    labels = set(coll.get_labels())
+
+    config = DLiteFilterConfig(
+        filterType="dlite/filter",
+        configuration={
+            "remove_datamodel": Image.uri,
+            "keep_label": "(image2)|(image4)",
+            "keep_referred": True,
+            "dry_run": True,
+            "collection_id": coll.uuid,
+        },
+    )
+    result = DLiteFilterStrategy(config).get()
+
+    assert set(coll.get_labels()) == labels
+    assert result.removed_labels == ["image3"]
+
+    stats = result.statistics
+    assert stats.scanned == 5
+    assert stats.marked == 4
+    assert stats.kept_by_datamodel == 0
+    assert stats.kept_by_label == 2
+    assert stats.kept_by_referrer == 1
+    assert stats.referred_closure == 4
+    assert stats.removed == 1
+    assert set(stats.timings) == {"index", "select", "referred"}
+
+    config.configuration.dry_run = False
+    config.configuration.statistics = True
+    result = DLiteFilterStrategy(config).get()
+    assert result.removed_labels is None
+    assert result.statistics.removed == 1
+    assert set(result.statistics.timings) == {
+        "index",
+        "select",
+        "referred",
+        "remove",
+        "update",
+    }
+    assert set(coll.get_labels()) == labels - {"image3"}
+
+
+def test_statistics_overlapping_rules(
+    initialize_collection: tuple[Collection, Instance],
+) -> None:
+    """Test that the per-rule statistics add up when the keep rules
+    overlap."""
+    import dlite
+
+    from oteapi_dlite.strategies.filter import (
+        DLiteFilterConfig,
+        DLiteFilterStrategy,
+    )
+
+    coll, _ = initialize_collection
+
+    # "innercoll" is kept by `keep_datamodel`, `keep_label` and
+    # `keep_referred`, while "image1" and "image2" are kept because they
+    # are referred to by "innercoll"
+    config = DLiteFilterConfig(
+        filterType="dlite/filter",
+        configuration={
+            "remove_label": ".*",
+            "keep_datamodel": dlite.COLLECTION_ENTITY,
+            "keep_label": "(innercoll)|(image4)",
+            "keep_referred": True,
+            "dry_run": True,
+            "collection_id": coll.uuid,
+        },
+    )
+    result = DLiteFilterStrategy(config).get()
+    stats = result.statistics
+
+    assert result.removed_labels == ["image3"]
+    assert stats.marked == 5
+    assert stats.kept_by_datamodel == 1
+    assert stats.kept_by_label == 1
+    assert stats.kept_by_referrer == 2
+    assert stats.removed == 1
+    assert stats.marked == (
+        stats.kept_by_datamodel
+        + stats.kept_by_label
+        + stats.kept_by_referrer
+        + stats.removed
+    )
@@ -6,6 +6,8 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from pathlib import Path
+
     from ..conftest import PathsTuple
 
 
@@ -58,3 +60,110 @@ def test_generate(paths: PathsTuple) -> None:
         "json", paths.outputdir / "image.json", "mode=r"
     )
     assert image2.asdict() == image_dict
+
+
+def test_generate_to_cache(tmp_path: Path) -> None:
+    """Test generate strategy storing the instance in the data cache."""
+    import json
+
+    import dlite
+    from oteapi.datacache import DataCache
+
+    from oteapi_dlite.strategies.generate import (
+        DLiteGenerateStrategy,
+        serialise,
+    )
+    from oteapi_dlite.utils import get_meta
+
+    coll = dlite.Collection()
+    Image = get_meta("http://onto-ns.com/meta/1.0/Image")
+    image = Image([2, 2, 1])
+    image.data = [[[1], [2]], [[3], [4]]]
+    coll.add("image", image)
+
+    cache = DataCache()
+    cache.add(coll.asjson(), key=coll.uuid)
+
+    config = {
+        "functionType": "application/vnd.dlite-generate",
+        "configuration": {
+            "label": "image",
+            "driver": "json",
+            "collection_id": coll.uuid,
+            "datacache_config": {"accessKey": "generated_image"},
+        },
+    }
+    DLiteGenerateStrategy(config).get()
+
+    # The content should be the same as when saving to file
+    image.save("json", tmp_path / "image.json", "mode=w")
+    data = cache.get("generated_image")
+    assert json.loads(data) == json.loads((tmp_path / "image.json").read_text())
+
+    # Drivers without in-memory serialisation fall back to a temporary file
+    image.save("yaml", tmp_path / "image.yaml", "mode=w")
+    assert (
+        serialise(image, "yaml", "mode=w")
+        == (tmp_path / "image.yaml").read_bytes()
+    )
+
+
+def test_generate_multiple(tmp_path: Path) -> None:
+    """Test generate strategy serialising several instances to one storage."""
+    import json
+
+    import dlite
+    from oteapi.datacache import DataCache
+
+    from oteapi_dlite.strategies.generate import DLiteGenerateStrategy
+    from oteapi_dlite.utils import get_meta
+
+    coll = dlite.Collection()
+    Image = get_meta("http://onto-ns.com/meta/1.0/Image")
+    images = [Image([1, 1, 1]) for _ in range(5)]
+    for i, image in enumerate(images):
+        coll.add(f"image{i}", image)
+    cache = DataCache()
+    cache.add(coll.asjson(), key=coll.uuid)
+
+    config = {
+        "functionType": "application/vnd.dlite-generate",
+        "configuration": {
+            "labels": ["image4"],
+            "label_pattern": "image[0-2]",
+            "driver": "json",
+            "location": str(tmp_path / "images.json"),
+            "options": "mode=w",
+            "collection_id": coll.uuid,
+        },
+    }
+    DLiteGenerateStrategy(config).get()
+    stored = json.loads((tmp_path / "images.json").read_text())
+    assert set(stored) == {images[i].uuid for i in (0, 1, 2, 4)}
+
+    config = {
+        "functionType": "application/vnd.dlite-generate",
+        "configuration": {
+            "datamodel": "http://onto-ns.com/meta/1.0/Image",
+            "all_instances": True,
+            "property_mappings": False,
+            "driver": "json",
+            "collection_id": coll.uuid,
+            "datacache_config": {"accessKey": "generated_images"},
+        },
+    }
+    DLiteGenerateStrategy(config).get()
+    stored = json.loads(cache.get("generated_images"))
+    assert set(stored) == {image.uuid for image in images}
+
+    # Only the first instance of `datamodel` is serialised by default
+    config["configuration"]["all_instances"] = False
+    DLiteGenerateStrategy(config).get()
+    stored = json.loads(cache.get("generated_images"))
+    assert set(stored) == {images[0].uuid}
+
+    # ...and all of them with `batch_instantiation`
+    config["configuration"]["batch_instantiation"] = True
+    DLiteGenerateStrategy(config).get()
+    stored = json.loads(cache.get("generated_images"))
+    assert set(stored) == {image.uuid for image in images}
@@ -5,6 +5,10 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+
     from ..conftest import PathsTuple
 
 
@@ -172,3 +176,168 @@ def test_generate_kb(paths: PathsTuple) -> None:
     assert ts.has(sim, EMMO.hasInput, ":input1")
     assert ts.has(sim, EMMO.hasInput, ":input2")
     assert ts.has(sim, EMMO.hasOutput, iri)
+
+
+def test_generate_kb_batch(tmp_path: Path) -> None:
+    """Test documentation of several generated instances with a single
+    write to the knowledge base."""
+    import dlite
+    from oteapi.datacache import DataCache
+    from tripper import OWL, RDF, Triplestore
+
+    from oteapi_dlite.strategies.generate import (
+        DLiteGenerateStrategy,
+        hasInput,
+        hasOutput,
+    )
+    from oteapi_dlite.utils import get_meta
+    from oteapi_dlite.utils.tspool import TRIPLESTORE_POOL
+
+    kb = tmp_path / "kb.ttl"
+    ts = Triplestore(backend="rdflib")
+    ts.add_triples(
+        [
+            ("http://ex.com#Sim", RDF.type, OWL.Class),
+            ("http://ex.com#input", RDF.type, "http://ex.com#Input"),
+        ]
+    )
+    ts.add_restriction(
+        "http://ex.com#Sim", hasInput, "http://ex.com#Input", "exactly", 1
+    )
+    ts.add_restriction(
+        "http://ex.com#Sim", hasOutput, "http://ex.com#MyData", "exactly", 1
+    )
+    ts.serialize(kb)
+    ts.close()
+
+    coll = dlite.Collection()
+    Image = get_meta("http://onto-ns.com/meta/1.0/Image")
+    images = [Image([1, 1, 1]) for _ in range(3)]
+    for i, image in enumerate(images):
+        coll.add(f"image{i}", image)
+    DataCache().add(coll.asjson(), key=coll.uuid)
+
+    kb_settings = {"backend": "rdflib", "triplestore_url": str(kb)}
+    config = {
+        "functionType": "application/vnd.dlite-generate",
+        "configuration": {
+            "label_pattern": "image.*",
+            "driver": "json",
+            "location": str(tmp_path / "images.json"),
+            "options": "mode=w",
+            "collection_id": coll.uuid,
+            "kb_document_class": "http://ex.com#MyData",
+            "kb_document_base_iri": "http://ex.com#",
+            "kb_document_computation": "http://ex.com#Sim",
+            "dlite_settings": {"tripper.triplestore": kb_settings},
+        },
+    }
+
+    calls = []
+    TRIPLESTORE_POOL.clear()
+    pooled = TRIPLESTORE_POOL.acquire(kb_settings)
+    add_triples = pooled.add_triples
+    pooled.add_triples = lambda triples: calls.append(add_triples(triples))
+    TRIPLESTORE_POOL.release(pooled)
+
+    DLiteGenerateStrategy(config).get()
+    assert len(calls) == 1
+    TRIPLESTORE_POOL.clear()
+
+    ts = Triplestore(**kb_settings)
+    iris = set(ts.subjects(RDF.type, "http://ex.com#MyData"))
+    assert len(iris) == 3
+    (sim,) = ts.subjects(RDF.type, "http://ex.com#Sim")
+    assert ts.has(sim, hasInput, "http://ex.com#input")
+    assert set(ts.objects(sim, hasOutput)) == iris
+
+
+def test_generate_kb_cached_restrictions(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that the restrictions of the computation class are only
+    looked up once for repeated documentation of the computation."""
+    import dlite
+    import tripper.convert
+    from oteapi.datacache import DataCache
+    from tripper import OWL, RDF, Triplestore
+
+    from oteapi_dlite.strategies.generate import (
+        DLiteGenerateStrategy,
+        hasInput,
+        hasOutput,
+    )
+    from oteapi_dlite.utils import get_meta
+    from oteapi_dlite.utils.kbcache import RESTRICTION_CACHE
+    from oteapi_dlite.utils.tspool import TRIPLESTORE_POOL
+
+    kb = tmp_path / "kb.ttl"
+    ts = Triplestore(backend="rdflib")
+    ts.add_triples(
+        [
+            ("http://ex.com#Sim", RDF.type, OWL.Class),
+            ("http://ex.com#input", RDF.type, "http://ex.com#Input"),
+        ]
+    )
+    ts.add_restriction(
+        "http://ex.com#Sim", hasInput, "http://ex.com#Input", "exactly", 1
+    )
+    ts.add_restriction(
+        "http://ex.com#Sim", hasOutput, "http://ex.com#MyData", "exactly", 1
+    )
+    ts.serialize(kb)
+    ts.close()
+
+    coll = dlite.Collection()
+    Image = get_meta("http://onto-ns.com/meta/1.0/Image")
+    coll.add("image", Image([1, 1, 1]))
+    DataCache().add(coll.asjson(), key=coll.uuid)
+
+    kb_settings = {"backend": "rdflib", "triplestore_url": str(kb)}
+    config = {
+        "functionType": "application/vnd.dlite-generate",
+        "configuration": {
+            "label": "image",
+            "driver": "json",
+            "location": str(tmp_path / "image.json"),
+            "options": "mode=w",
+            "collection_id": coll.uuid,
+            "kb_document_class": "http://ex.com#MyData",
+            "kb_document_base_iri": "http://ex.com#",
+            "kb_document_computation": "http://ex.com#Sim",
+            "dlite_settings": {"tripper.triplestore": kb_settings},
+        },
+    }
+
+    # Documenting the data resource requires network access
+    monkeypatch.setattr(
+        tripper.convert, "from_container", lambda *_args, **_kwargs: []
+    )
+
+    calls = []
+    TRIPLESTORE_POOL.clear()
+    RESTRICTION_CACHE.clear()
+    pooled = TRIPLESTORE_POOL.acquire(kb_settings)
+    restrictions = pooled.restrictions
+    monkeypatch.setattr(
+        pooled,
+        "restrictions",
+        lambda *args: calls.append(args) or restrictions(*args),
+    )
+    TRIPLESTORE_POOL.release(pooled)
+
+    DLiteGenerateStrategy(config).get()
+    assert len(calls) == 2
+
+    # The second run is served from the cache
+    DLiteGenerateStrategy(config).get()
+    assert len(calls) == 2
+    TRIPLESTORE_POOL.clear()
+    RESTRICTION_CACHE.clear()
+
+    ts = Triplestore(**kb_settings)
+    sims = set(ts.subjects(RDF.type, "http://ex.com#Sim"))
+    assert len(sims) == 2
+    for sim in sims:
+        assert ts.has(sim, hasInput, "http://ex.com#input")
+        assert len(set(ts.objects(sim, hasOutput))) == 1
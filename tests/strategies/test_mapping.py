@@ -2,6 +2,13 @@
 
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+
 
 def test_mapping_without_prefixes() -> None:
     """Test without prefixes."""
@@ -91,3 +98,101 @@ def test_mapping_with_prefixes() -> None:
     assert len(list(coll.get_relations())) == len(relations)
     assert (FORCES.forces, MAP.mapsTo, EMMO.Force) in relations
     assert (ENERGY.energy, MAP.mapsTo, EMMO.PotentialEnergy) in relations
+
+
+def test_mapping_cached_triples(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that repeated runs reuse the expanded triples and do not
+    re-insert triples already in the collection."""
+    import dlite
+    from tripper import Triplestore
+
+    from oteapi_dlite.strategies.mapping import (
+        DLiteMappingConfig,
+        DLiteMappingStrategy,
+    )
+    from oteapi_dlite.utils import get_collection
+    from oteapi_dlite.utils.triples import TRIPLES_CACHE
+
+    coll = dlite.Collection()
+    config = DLiteMappingConfig(
+        mappingType="mappings",
+        prefixes={
+            "f": "http://onto-ns.com/meta/0.1/Forces#",
+            "ex": "http://example.com/onto#",
+        },
+        triples=[
+            ("f:forces", "ex:mapsTo", "ex:Force"),
+            (
+                "http://onto-ns.com/meta/0.1/Forces#forces",
+                "ex:mapsTo",
+                "ex:Force",
+            ),
+        ],
+        configuration={"collection_id": coll.uuid},
+    )
+    expected = (
+        "http://onto-ns.com/meta/0.1/Forces#forces",
+        "http://example.com/onto#mapsTo",
+        "http://example.com/onto#Force",
+    )
+
+    TRIPLES_CACHE.clear()
+    DLiteMappingStrategy(config).initialize()
+    assert len(TRIPLES_CACHE) == 1
+    relations = list(get_collection(coll.uuid).get_relations(*expected))
+    assert len(relations) == 1
+
+    # Second run with the same mappings
+    def add_triples(*_args, **_kwargs):
+        raise AssertionError("triples should not be re-inserted")
+
+    monkeypatch.setattr(Triplestore, "add_triples", add_triples)
+    DLiteMappingStrategy(config).initialize()
+    assert len(TRIPLES_CACHE) == 1
+    relations = list(get_collection(coll.uuid).get_relations(*expected))
+    assert len(relations) == 1
+
+
+def test_mapping_prefixes_not_bound(tmp_path: Path) -> None:
+    """Test that the prefixes of a mapping are not bound to a pooled
+    triplestore shared with other pipelines."""
+    from tripper import Triplestore
+
+    from oteapi_dlite.strategies.mapping import (
+        DLiteMappingConfig,
+        DLiteMappingStrategy,
+    )
+    from oteapi_dlite.utils import (
+        acquire_triplestore,
+        get_collection,
+        release_triplestore,
+    )
+    from oteapi_dlite.utils.tspool import TRIPLESTORE_POOL
+
+    kb = tmp_path / "kb.ttl"
+    Triplestore(backend="rdflib").serialize(kb)
+    kb_settings = {"backend": "rdflib", "triplestore_url": str(kb)}
+
+    TRIPLESTORE_POOL.clear()
+    config = DLiteMappingConfig(
+        mappingType="mappings",
+        prefixes={"f": "http://onto-ns.com/meta/0.1/Forces#"},
+        triples=[("f:forces", "http://example.com/mapsTo", "f:Force")],
+        configuration={
+            "collection_id": get_collection().uuid,
+            "dlite_settings": {"tripper.triplestore": kb_settings},
+        },
+    )
+    DLiteMappingStrategy(config).initialize()
+
+    ts = acquire_triplestore(kb_settings)
+    try:
+        assert "f" not in ts.namespaces
+        assert ts.has(
+            "http://onto-ns.com/meta/0.1/Forces#forces",
+            "http://example.com/mapsTo",
+            "http://onto-ns.com/meta/0.1/Forces#Force",
+        )
+    finally:
+        release_triplestore(ts)
+        TRIPLESTORE_POOL.clear()
@@ -4,7 +4,11 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
+import pytest
+
 if TYPE_CHECKING:
+    from pathlib import Path
+
     from ..conftest import PathsTuple
 
 
@@ -99,3 +103,77 @@ def test_parse_label(paths: PathsTuple) -> None:
         "groundstate_energy",
     }
     assert inst.properties["name"] == "H2"
+
+
+def test_parse_batch(paths: PathsTuple, tmp_path: Path) -> None:
+    """Test parsing several locations and download URLs in batch mode."""
+    import json
+    from uuid import uuid4
+
+    import dlite
+    from oteapi.datacache import DataCache
+
+    from oteapi_dlite.strategies.parse import DLiteParseStrategy
+
+    (data,) = json.loads(
+        (paths.staticdir / "molecule.json").read_text()
+    ).values()
+    files = []
+    for i in range(6):
+        data["properties"]["name"] = f"molecule{i}"
+        files.append(tmp_path / f"molecule{i}.json")
+        files[-1].write_text(json.dumps({str(uuid4()): data}))
+
+    coll = dlite.Collection()
+    DataCache().add(coll.asjson(), key=coll.uuid)
+    config = {
+        "parserType": "application/vnd.dlite-parse",
+        "configuration": {
+            "driver": "json",
+            "locations": [str(tmp_path / "molecule[0-2].json")],
+            "downloadUrls": [path.as_uri() for path in files[3:]],
+            "mediaType": "application/json",
+            "labels": [f"mol{i}" for i in range(6)],
+            "max_workers": 2,
+            "collection_id": coll.uuid,
+        },
+    }
+    DLiteParseStrategy(config).get()
+
+    for i in range(6):
+        assert coll.get(f"mol{i}").name == f"molecule{i}"
+
+
+def test_parse_from_bytes(
+    paths: PathsTuple, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that json content is parsed without writing a temporary file."""
+    import dlite
+    from oteapi.datacache import DataCache
+
+    from oteapi_dlite.strategies.parse import DLiteParseStrategy
+
+    def getfile(*_args, **_kwargs):
+        raise AssertionError("content should not be written to file")
+
+    monkeypatch.setattr(DataCache, "getfile", getfile)
+
+    sample_file = paths.staticdir / "molecule.json"
+    cache = DataCache()
+    key = cache.add(sample_file.read_bytes())
+
+    coll = dlite.Collection()
+    cache.add(coll.asjson(), key=coll.uuid)
+    config = {
+        "parserType": "application/vnd.dlite-parse",
+        "configuration": {
+            "driver": "json",
+            "label": "molecule",
+            "downloadUrl": sample_file.as_uri(),
+            "mediaType": "application/json",
+            "collection_id": coll.uuid,
+            "datacache_config": {"accessKey": key},
+        },
+    }
+    DLiteParseStrategy(config).get()
+    assert coll.get("molecule").name == "H2"
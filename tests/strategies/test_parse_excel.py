@@ -4,11 +4,14 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
+import pytest
+
 if TYPE_CHECKING:
     from ..conftest import PathsTuple
 
 
-def test_parse_excel(paths: PathsTuple) -> None:
+@pytest.mark.parametrize("streaming", [False, True])
+def test_parse_excel(paths: PathsTuple, streaming: bool) -> None:
     """Test excel parse strategy."""
     import dlite
     import numpy as np
@@ -34,6 +37,8 @@ def test_parse_excel(paths: PathsTuple) -> None:
             "mediaType": (
                 "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
             ),
+            "streaming": streaming,
+            "chunk_size": 3,
         },
     }
 
@@ -64,3 +69,175 @@ def test_parse_excel(paths: PathsTuple) -> None:
     assert np.all(inst.Sample == ["A", "B", "C", "D"])
     assert np.allclose(inst.Temperature, [293.15, 300, 320, 340])
     assert np.all(inst.Pressure == [100000, 200000, 300000, 400000])
+
+
+def test_column_buffer() -> None:
+    """Test appending chunks with missing values and changing dtypes."""
+    import numpy as np
+
+    from oteapi_dlite.strategies.parse_excel import ColumnBuffer
+    from oteapi_dlite.utils import column2array
+
+    chunks = [
+        [None, None],
+        [1, 2],
+        [3, None],
+        [None, None],
+    ]
+    buffer = ColumnBuffer(capacity=3)
+    for chunk in chunks:
+        buffer.append(chunk)
+    expected = column2array([value for chunk in chunks for value in chunk])
+    assert buffer.array().dtype == expected.dtype
+    assert np.allclose(buffer.array(), expected, equal_nan=True)
+
+    buffer = ColumnBuffer()
+    buffer.append([None])
+    buffer.append(["a", "bcd"])
+    buffer.append([None, "efghi"])
+    assert buffer.array().tolist() == ["", "a", "bcd", "", "efghi"]
+
+    buffer = ColumnBuffer()
+    buffer.append([None])
+    assert np.isnan(buffer.array()).all()
+
+
+def test_bounded_map() -> None:
+    """Test that at most `ahead` items are submitted before their results
+    are consumed."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    from oteapi_dlite.strategies.parse_excel import bounded_map
+
+    drawn = []
+
+    def items():
+        for x in range(10):
+            drawn.append(x)
+            yield x
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = bounded_map(executor, lambda x: x * x, items(), ahead=2)
+        assert next(results) == 0
+        assert drawn == [0, 1, 2]
+        assert list(results) == [x * x for x in range(1, 10)]
+    assert drawn == list(range(10))
+
+
+@pytest.mark.parametrize("read_only", [False, True])
+def test_read_worksheet_col_from(paths: PathsTuple, read_only: bool) -> None:
+    """Test reading a region that does not start in the first column.
+
+    The core excel_xlsx parser indexes rows by absolute column number in
+    this case, while read_worksheet() reads the selected columns.
+    """
+    import numpy as np
+    from openpyxl import load_workbook
+    from oteapi.strategies.parse.excel_xlsx import XLSXParseConfig
+
+    from oteapi_dlite.strategies.parse_excel import read_worksheet
+
+    sample_file = paths.staticdir / "test_parse_excel.xlsx"
+    workbook = load_workbook(sample_file, read_only=read_only, data_only=True)
+    try:
+        columns = read_worksheet(
+            workbook["Sheet1"],
+            XLSXParseConfig(
+                worksheet="Sheet1",
+                header_row=1,
+                row_from=2,
+                col_from="B",
+                col_to="C",
+            ),
+        )
+    finally:
+        workbook.close()
+
+    assert list(columns) == ["Temperature(K)", "Pressure(PA)"]
+    assert np.allclose(columns["Temperature(K)"], [293.15, 300, 320, 340])
+    assert columns["Pressure(PA)"].tolist() == [100000, 200000, 300000, 400000]
+
+
+@pytest.mark.parametrize("max_workers", [None, 2])
+def test_parse_excel_sheets(paths: PathsTuple, max_workers: int | None) -> None:
+    """Test parsing several worksheet regions in batch mode."""
+    import dlite
+    import numpy as np
+    from oteapi.datacache import DataCache
+
+    from oteapi_dlite.strategies.parse_excel import DLiteExcelStrategy
+
+    sample_file = paths.staticdir / "test_parse_excel.xlsx"
+
+    cache = DataCache()
+    coll = dlite.Collection()
+    cache.add(coll.asjson(), key=coll.uuid)
+
+    config = {
+        "parserType": "application/vnd.dlite-xlsx",
+        "configuration": {
+            "sheets": [
+                {
+                    "excel_config": {
+                        "worksheet": "Sheet1",
+                        "header_row": "1",
+                        "row_from": "2",
+                        "row_to": "3",
+                    },
+                    "label": "first",
+                },
+                {
+                    "excel_config": {
+                        "worksheet": "Sheet1",
+                        "header_row": "1",
+                        "row_from": "4",
+                        "col_from": "B",
+                    },
+                    "label": "last",
+                },
+            ],
+            "downloadUrl": sample_file.as_uri(),
+            "mediaType": (
+                "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            ),
+            "collection_id": coll.uuid,
+            "max_workers": max_workers,
+        },
+    }
+
+    result = DLiteExcelStrategy(config).get()
+    assert result.labels == ["first", "last"]
+
+    first = coll.get("first")
+    assert first.uuid == result.inst_uuids[0]
+    assert np.all(first.Sample == ["A", "B"])
+    assert np.allclose(first.Temperature, [293.15, 300])
+    assert np.all(first.Pressure == [100000, 200000])
+
+    last = coll.get("last")
+    assert last.uuid == result.inst_uuids[1]
+    assert "Sample" not in last.properties
+    assert np.allclose(last.Temperature, [320, 340])
+    assert np.all(last.Pressure == [300000, 400000])
+
+
+def test_infer_metadata() -> None:
+    """Test that inferred metadata is reused for identical columns."""
+    import numpy as np
+
+    from oteapi_dlite.strategies.parse_excel import infer_metadata
+
+    rec = np.rec.fromarrays(
+        [np.array(["A", "B"]), np.array([1.0, 2.0])], names=["Sample", "T"]
+    )
+    meta = infer_metadata(rec, units=("", "K"))
+    assert meta.uri.startswith(
+        "http://onto-ns.com/meta/1.0/generated_from_excel_"
+    )
+    assert infer_metadata(rec[:0], units=("", "K")) is meta
+    assert infer_metadata(rec, units=("", "degC")).uri != meta.uri
+
+    other = np.rec.fromarrays(
+        [np.array(["A", "B"]), np.array([1, 2])], names=["Sample", "T"]
+    )
+    assert infer_metadata(other, units=("", "K")).uri != meta.uri
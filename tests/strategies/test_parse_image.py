@@ -104,3 +104,129 @@ def test_image(
 
     # Compare pixel values
     assert np.all(np.equal(inst.data, subset))
+
+
+@pytest.mark.parametrize("mode", ["L", "RGB", "RGBA", "CMYK", "1"])
+def test_image_array(mode: str, paths: PathsTuple) -> None:
+    """Test that image_array() gives the same result as decoding the image
+    with Pillow, without copying the data for raster modes."""
+    import tracemalloc
+
+    import numpy as np
+    from PIL import Image
+
+    from oteapi_dlite.strategies.parse_image import RASTER_MODES, image_array
+
+    with Image.open(paths.staticdir / "sample_640_426.png") as orig:
+        image = orig.convert(mode)
+    raw = image.tobytes()
+    expected = np.asarray(image)
+
+    tracemalloc.start()
+    try:
+        data = image_array(raw, mode=mode, size=image.size)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    if mode in RASTER_MODES:
+        assert np.shares_memory(data, np.frombuffer(raw, dtype=np.uint8))
+        assert peak < len(raw) // 100
+        assert data.shape == (image.height, image.width, RASTER_MODES[mode])
+        expected = expected.reshape(data.shape)
+    assert np.array_equal(data, expected)
+
+
+def test_image_tiles(paths: PathsTuple) -> None:
+    """Test parsing an image into tiles."""
+    import dlite
+    import numpy as np
+    from oteapi.datacache import DataCache
+    from PIL import Image
+
+    from oteapi_dlite.strategies.parse_image import DLiteImageParseStrategy
+
+    sample_file = paths.staticdir / "sample_640_426.png"
+    crop_rect = (20, 10, 620, 410)
+
+    cache = DataCache()
+    coll = dlite.Collection()
+    cache.add(coll.asjson(), key=coll.uuid)
+    config = {
+        "parserType": "image/vnd.dlite-image",
+        "configuration": {
+            "image_label": "test_image",
+            "crop": crop_rect,
+            "tile_height": 150,
+            "tile_width": 250,
+            "downloadUrl": sample_file.as_uri(),
+            "mediaType": "image/vnd.dlite-png",
+            "collection_id": coll.uuid,
+            "key": cache.add(sample_file.read_bytes()),
+        },
+    }
+    DLiteImageParseStrategy(config).get()
+
+    tiling = coll.get("test_image")
+    assert tiling.meta.uri == "http://onto-ns.com/meta/1.0/ImageTiling"
+    assert (tiling.height, tiling.width) == (400, 600)
+    assert len(tiling.labels) == 9  # 3 rows, 3 columns
+    assert "test_image-tile-2-1" in tiling.labels
+
+    # Stitch tiles together and compare with the cropped image
+    stitched = np.zeros((tiling.height, tiling.width, 3), dtype=np.uint8)
+    for label, top, left in zip(
+        tiling.labels, tiling.top, tiling.left, strict=True
+    ):
+        tile = coll.get(label)
+        assert tile.dimensions["nheight"] <= 150
+        assert tile.dimensions["nwidth"] <= 250
+        height, width, _ = tile.data.shape
+        stitched[top : top + height, left : left + width] = tile.data
+
+    with Image.open(sample_file) as image:
+        expected = np.asarray(image.crop(crop_rect))
+    assert np.array_equal(stitched, expected)
+
+
+def test_read_region(
+    paths: PathsTuple, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that only the strips overlapping a region are decoded."""
+    import numpy as np
+    from PIL import Image, ImageFile
+
+    from oteapi_dlite.strategies import parse_image
+    from oteapi_dlite.strategies.parse_image import read_region
+
+    # Uncompressed 60x40 RGB image stored in strips of 4 rows
+    filename = paths.staticdir / "sample_strips_60_40.tiff"
+    with Image.open(filename) as image:
+        data = np.asarray(image)
+
+    sizes = []
+    load_prepare = ImageFile.ImageFile.load_prepare
+
+    def record_size(self: ImageFile.ImageFile) -> None:
+        sizes.append(self.size)
+        load_prepare(self)
+
+    monkeypatch.setattr(ImageFile.ImageFile, "load_prepare", record_size)
+
+    for box in [(2, 5, 22, 15), (50, 38, 60, 40), (0, 0, 60, 40)]:
+        left, top, right, bottom = box
+        region = read_region(filename, "TIFF", box)
+        assert np.array_equal(np.asarray(region), data[top:bottom, left:right])
+    assert sizes == [(60, 12), (60, 4), (60, 40)]
+
+    # The image is decoded in full if decoding only some strips fails or
+    # gives a region of the wrong size
+    def fail(*_args: object) -> None:
+        raise AttributeError("offset")
+
+    for decode_tiles in [fail, lambda *_args: Image.new("RGB", (1, 1))]:
+        monkeypatch.setattr(parse_image, "decode_tiles", decode_tiles)
+        sizes.clear()
+        region = read_region(filename, "TIFF", (2, 5, 22, 15))
+        assert np.array_equal(np.asarray(region), data[5:15, 2:22])
+        assert sizes == [(60, 40)]
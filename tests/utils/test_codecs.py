@@ -0,0 +1,130 @@
+"""Tests for oteapi-dlite.utils.codecs"""
+
+from __future__ import annotations
+
+import pytest
+
+
+@pytest.mark.parametrize("name", ["json", "json-zlib"])
+def test_codec_roundtrip(name: str) -> None:
+    """Test encoding and decoding a collection."""
+    import gc
+
+    import dlite
+
+    from oteapi_dlite.utils.codecs import get_codec
+    from oteapi_dlite.utils.delta import relation_set
+
+    codec = get_codec(name)
+    coll = dlite.Collection()
+    for i in range(100):
+        coll.add_relation(f"label{i}", "_has-meta", "http://example.com/A")
+    uuid = coll.uuid
+    relations = relation_set(coll)
+    data = codec.encode(coll)
+
+    del coll
+    gc.collect()
+    assert not dlite.has_instance(uuid)
+
+    coll = codec.decode(data, uuid)
+    assert coll.uuid == uuid
+    assert relation_set(coll) == relations
+
+
+def test_codec_from_settings() -> None:
+    """Test codec_from_settings()."""
+    from oteapi_dlite.utils import codec_from_settings
+    from oteapi_dlite.utils.codecs import COLLECTION_CODEC_SETTING
+
+    assert codec_from_settings({}) is None
+    assert (
+        codec_from_settings({COLLECTION_CODEC_SETTING: "json-zlib"})
+        == "json-zlib"
+    )
+    assert (
+        codec_from_settings({COLLECTION_CODEC_SETTING: '"json-zlib"'})
+        == "json-zlib"
+    )
+    with pytest.raises(ValueError, match="must be a string"):
+        codec_from_settings({COLLECTION_CODEC_SETTING: 1})
+
+
+def test_update_collection_with_codec() -> None:
+    """Test that the codec is recorded and reused by update_collection()."""
+    from oteapi.datacache import DataCache
+
+    from oteapi_dlite.utils import get_collection, update_collection
+    from oteapi_dlite.utils.delta import CollectionLog, log_key
+
+    cache = DataCache()
+    coll = get_collection()
+
+    def read_log() -> CollectionLog:
+        return CollectionLog.from_dict(cache.get(log_key(coll.uuid)))
+
+    assert read_log().codec == "json"
+
+    for i in range(10):
+        coll.add_relation(f"s{i}", "p", "o")
+    update_collection(coll, codec="json-zlib")
+    assert read_log().codec == "json-zlib"
+    assert isinstance(cache.get(coll.uuid), bytes)
+
+    coll.add_relation("s10", "p", "o")
+    update_collection(coll)  # Keeps the recorded codec and writes a delta
+    assert read_log().codec == "json-zlib"
+    assert len(read_log().deltas) == 1
+
+    with pytest.raises(ValueError, match="unknown collection codec"):
+        update_collection(coll, codec="unknown")
+
+
+def test_decode_any() -> None:
+    """Test decoding a collection with unknown codec."""
+    import dlite
+
+    from oteapi_dlite.utils.codecs import decode_any, get_codec
+
+    coll = dlite.Collection()
+    coll.add_relation("s", "p", "o")
+    for name in ("json", "json-zlib"):
+        data = get_codec(name).encode(coll)
+        assert ("s", "p", "o") in set(
+            decode_any(data, coll.uuid).get_relations()
+        )
+
+
+def test_codec_from_session() -> None:
+    """Test that strategies honour the codec selected in the session."""
+    from oteapi.datacache import DataCache
+
+    from oteapi_dlite.strategies.filter import (
+        DLiteFilterConfig,
+        DLiteFilterStrategy,
+    )
+    from oteapi_dlite.utils import get_collection
+    from oteapi_dlite.utils.codecs import COLLECTION_CODEC_SETTING
+    from oteapi_dlite.utils.delta import CollectionLog, log_key
+
+    cache = DataCache()
+    dlite_settings = {COLLECTION_CODEC_SETTING: "json-zlib"}
+    coll = get_collection(dlite_settings=dlite_settings)
+    log = CollectionLog.from_dict(cache.get(log_key(coll.uuid)))
+    assert log.codec == "json-zlib"
+
+    coll = get_collection()
+    for i in range(10):
+        coll.add_relation(f"s{i}", "p", "o")
+    config = DLiteFilterConfig(
+        filterType="dlite/filter",
+        query="^s",
+        configuration={
+            "collection_id": coll.uuid,
+            "dlite_settings": dlite_settings,
+        },
+    )
+    DLiteFilterStrategy(config).get()
+    log = CollectionLog.from_dict(cache.get(log_key(coll.uuid)))
+    assert log.codec == "json-zlib"
+    assert isinstance(cache.get(coll.uuid), bytes)
@@ -0,0 +1,142 @@
+"""Tests for oteapi-dlite.utils.delta"""
+
+from __future__ import annotations
+
+
+def test_collection_delta() -> None:
+    """Test creating, serialising and applying a delta."""
+    import dlite
+
+    from oteapi_dlite.utils.delta import CollectionDelta, relation_set
+
+    coll = dlite.Collection()
+    coll.add_relation("a", "p", "b")
+    coll.add_relation("c", "p", "d", "xsd:anyURI")
+    old = relation_set(coll)
+
+    coll.remove_relations("a", "p", "b")
+    coll.add_relation("e", "p", "f")
+    new = relation_set(coll)
+
+    delta = CollectionDelta.from_relations(old, new)
+    assert len(delta) == 2
+    assert delta.added == [("e", "p", "f", None)]
+    assert delta.removed == [("a", "p", "b", None)]
+
+    delta = CollectionDelta.from_dict(delta.asdict())
+    coll2 = dlite.Collection()
+    coll2.add_relation("a", "p", "b")
+    coll2.add_relation("c", "p", "d", "xsd:anyURI")
+    delta.apply(coll2)
+    assert relation_set(coll2) == new
+
+
+def test_update_collection_with_deltas() -> None:
+    """Test that update_collection() writes deltas and that get_collection()
+    replays them."""
+    import gc
+
+    import dlite
+    from oteapi.datacache import DataCache
+
+    from oteapi_dlite.utils import get_collection, update_collection
+    from oteapi_dlite.utils.delta import (
+        MAX_DELTAS,
+        CollectionLog,
+        log_key,
+        relation_set,
+    )
+    from oteapi_dlite.utils.registry import COLLECTION_REGISTRY
+
+    def read_log() -> CollectionLog:
+        return CollectionLog.from_dict(cache.get(log_key(uuid)))
+
+    cache = DataCache()
+    coll = get_collection()
+    uuid = coll.uuid
+    for i in range(10):
+        coll.add_relation(f"s{i}", "p", f"o{i}")
+    update_collection(coll)
+    assert read_log().deltas == []
+    base = cache.get(uuid)
+    generation = read_log().generation
+
+    coll.add_relation("s10", "p", "o10")
+    update_collection(coll)
+    coll.remove_relations("s0", "p", "o0")
+    update_collection(coll)
+    update_collection(coll)  # unchanged collection, nothing is written
+    log = read_log()
+    assert len(log.deltas) == 2
+    assert log.generation == generation + 2
+    assert cache.get(uuid) == base
+    assert log.deltas[1].asdict() == {
+        "added": [],
+        "removed": [["s0", "p", "o0", None]],
+    }
+    expected = relation_set(coll)
+
+    # Load collection from the data cache in a clean registry
+    COLLECTION_REGISTRY.clear()
+    del coll
+    gc.collect()
+    assert not dlite.has_instance(uuid)
+
+    coll = get_collection(uuid)
+    assert relation_set(coll) == expected
+
+    # Compaction
+    for i in range(MAX_DELTAS):
+        coll.add_relation(f"t{i}", "p", f"u{i}")
+        update_collection(coll)
+    assert len(read_log().deltas) < MAX_DELTAS
+    assert cache.get(uuid) != base
+
+
+def test_direct_write_resets_log() -> None:
+    """Test that a collection written directly to the data cache is not
+    combined with the log of a previous base snapshot."""
+    import gc
+
+    import dlite
+    from oteapi.datacache import DataCache
+
+    from oteapi_dlite.utils import get_collection, update_collection
+    from oteapi_dlite.utils.delta import CollectionLog, log_key, relation_set
+    from oteapi_dlite.utils.registry import COLLECTION_REGISTRY
+
+    cache = DataCache()
+    coll = get_collection()
+    uuid = coll.uuid
+    for i in range(10):
+        coll.add_relation(f"s{i}", "p", f"o{i}")
+    update_collection(coll)
+    coll.add_relation("s10", "p", "o10")
+    update_collection(coll)
+    assert CollectionLog.from_dict(cache.get(log_key(uuid))).deltas
+
+    # Write another collection with the same UUID directly as JSON
+    COLLECTION_REGISTRY.clear()
+    del coll
+    gc.collect()
+    other = dlite.Collection(id=uuid)
+    other.add_relation("x", "p", "y")
+    cache.add(other.asjson(), key=uuid)
+    expected = relation_set(other)
+    del other
+    gc.collect()
+
+    coll = get_collection(uuid)
+    assert relation_set(coll) == expected
+
+    # The next update writes a new base snapshot
+    coll.add_relation("z", "p", "w")
+    update_collection(coll)
+    log = CollectionLog.from_dict(cache.get(log_key(uuid)))
+    assert log.deltas == []
+    COLLECTION_REGISTRY.clear()
+    del coll
+    gc.collect()
+    assert relation_set(get_collection(uuid)) == expected | {
+        ("z", "p", "w", None)
+    }
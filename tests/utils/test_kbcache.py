@@ -0,0 +1,93 @@
+"""Tests for oteapi_dlite.utils.kbcache."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pytest
+
+
+def test_restriction_individuals(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test caching, invalidation and expiry of restriction lookups."""
+    from tripper import OWL, RDF, Triplestore
+
+    from oteapi_dlite.strategies.generate import hasInput, hasOutput
+    from oteapi_dlite.utils.kbcache import (
+        RESTRICTION_CACHE,
+        restriction_individuals,
+    )
+
+    ts = Triplestore(backend="rdflib")
+    ts.add_triples(
+        [
+            ("http://ex.com#Sim", RDF.type, OWL.Class),
+            ("http://ex.com#input", RDF.type, "http://ex.com#Input"),
+        ]
+    )
+    ts.add_restriction(
+        "http://ex.com#Sim", hasInput, "http://ex.com#Input", "exactly", 1
+    )
+    ts.add_restriction(
+        "http://ex.com#Sim", hasOutput, "http://ex.com#Output", "exactly", 1
+    )
+
+    calls = []
+    restrictions = ts.restrictions
+    monkeypatch.setattr(
+        ts,
+        "restrictions",
+        lambda *args: calls.append(args) or restrictions(*args),
+    )
+
+    RESTRICTION_CACHE.clear()
+    inputs = restriction_individuals(ts, "http://ex.com#Sim", hasInput)
+    assert inputs == [(hasInput, "http://ex.com#Input", "http://ex.com#input")]
+    outputs = restriction_individuals(ts, "http://ex.com#Sim", hasOutput)
+    assert outputs == [(hasOutput, "http://ex.com#Output", None)]
+    assert len(calls) == 2
+
+    # Repeated lookups are cached
+    assert restriction_individuals(ts, "http://ex.com#Sim", hasInput) == inputs
+    assert (
+        restriction_individuals(ts, "http://ex.com#Sim", hasOutput) == outputs
+    )
+    assert len(calls) == 2
+
+    # Writing an individual of the computation class or of unrelated
+    # classes does not invalidate the cache
+    triples = [
+        ("http://ex.com#sim", RDF.type, "http://ex.com#Sim"),
+        ("http://ex.com#other", RDF.type, "http://ex.com#Other"),
+    ]
+    ts.add_triples(triples)
+    RESTRICTION_CACHE.invalidate(ts, triples)
+    assert len(RESTRICTION_CACHE) == 2
+
+    # Writing a new output individual invalidates the output lookup
+    triples = [("http://ex.com#output", RDF.type, "http://ex.com#Output")]
+    ts.add_triples(triples)
+    RESTRICTION_CACHE.invalidate(ts, triples)
+    assert len(RESTRICTION_CACHE) == 1
+    outputs = restriction_individuals(ts, "http://ex.com#Sim", hasOutput)
+    assert outputs == [
+        (hasOutput, "http://ex.com#Output", "http://ex.com#output")
+    ]
+    assert len(calls) == 3
+
+    # New individuals created by the writer itself are ignored
+    triples = [
+        ("http://ex.com#output2", RDF.type, "http://ex.com#Output"),
+        ("http://ex.com#sim2", hasOutput, "http://ex.com#output2"),
+    ]
+    ts.add_triples(triples)
+    RESTRICTION_CACHE.invalidate(ts, triples, created=["http://ex.com#output2"])
+    assert len(RESTRICTION_CACHE) == 2
+
+    # Expired entries are looked up again
+    monkeypatch.setattr(RESTRICTION_CACHE, "ttl", -1.0)
+    RESTRICTION_CACHE.clear()
+    restriction_individuals(ts, "http://ex.com#Sim", hasInput)
+    restriction_individuals(ts, "http://ex.com#Sim", hasInput)
+    assert len(calls) == 5
+    RESTRICTION_CACHE.clear()
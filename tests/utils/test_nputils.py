@@ -0,0 +1,104 @@
+"""Tests for oteapi-dlite.utils.nputils"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any
+
+
+def reference_dict2recarray(excel_dict: dict[str, Any]) -> Any:
+    """The original implementation of dict2recarray(), iterating over
+    every cell twice in Python."""
+    import numpy as np
+
+    arrays = []
+    for arr in excel_dict.values():
+        if all(
+            isinstance(v, (bool, int, float, complex, None.__class__))
+            for v in arr
+        ):
+            arrays.append([np.nan if v is None else v for v in arr])
+        elif all(isinstance(v, (str, bytes, None.__class__)) for v in arr):
+            arrays.append(["" if v is None else v for v in arr])
+        else:
+            arrays.append(arr)
+    return np.rec.fromarrays(arrays, names=list(excel_dict.keys()))
+
+
+def make_columns(nrows: int) -> dict[str, list]:
+    """Return a dict with columns of different types and missing values."""
+    return {
+        "int": list(range(nrows)),
+        "float": [i / 3 if i % 10 else None for i in range(nrows)],
+        "nullable_int": [i if i % 7 else None for i in range(nrows)],
+        "bool": [bool(i % 2) for i in range(nrows)],
+        "str": [f"s{i}" if i % 5 else None for i in range(nrows)],
+        "empty": [None] * nrows,
+    }
+
+
+def test_dict2recarray() -> None:
+    """Test that dict2recarray() gives the same result as the original
+    implementation."""
+    import numpy as np
+
+    from oteapi_dlite.utils import dict2recarray
+
+    columns = make_columns(1000)
+    rec = dict2recarray(columns)
+    expected = reference_dict2recarray(columns)
+
+    assert rec.dtype == expected.dtype
+    for name in columns:
+        if rec[name].dtype.kind == "f":
+            assert np.allclose(rec[name], expected[name], equal_nan=True)
+        else:
+            assert np.array_equal(rec[name], expected[name])
+
+
+def test_dict2recarray_masked() -> None:
+    """Test masked record arrays with nullable integers and booleans."""
+    import numpy as np
+
+    from oteapi_dlite.utils import dict2recarray
+
+    rec = dict2recarray(
+        {"a": [1, None, 3], "b": [True, None, False], "c": ["x", None, "z"]},
+        names=["a", "b", "c"],
+        masked=True,
+    )
+    assert rec["a"].dtype == np.int64
+    assert rec["b"].dtype == np.bool_
+    assert rec["a"].tolist() == [1, None, 3]
+    assert rec["b"].tolist() == [True, None, False]
+    assert rec["c"].tolist() == ["x", None, "z"]
+
+
+def test_column2array_large_int() -> None:
+    """Test that integers too large for int64 give an object array."""
+    import numpy as np
+
+    from oteapi_dlite.utils.nputils import column2array
+
+    big = 2**70
+    arr = column2array([1, big])
+    assert arr.dtype == object
+    assert arr.tolist() == [1, big]
+
+    arr = column2array([1, big, None], masked=True)
+    assert arr.dtype == object
+    assert arr.tolist() == [1, big, None]
+
+    arr = column2array([1, big, None])
+    assert arr.dtype == object
+    assert arr[:2].tolist() == [1, big]
+    assert np.isnan(arr[2])
+
+    arr = column2array([1, -big, None])
+    assert arr.dtype == object
+    assert arr[1] == -big
+
+    arr = column2array([1, 2, None])
+    assert arr.dtype == np.float64
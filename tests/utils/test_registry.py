@@ -0,0 +1,80 @@
+"""Tests for oteapi-dlite.utils.registry"""
+
+from __future__ import annotations
+
+
+def test_registry_lru() -> None:
+    """Test that only the most recently used collections are kept alive
+    by the registry."""
+    import gc
+
+    import dlite
+
+    from oteapi_dlite.utils.registry import CollectionRegistry
+
+    registry = CollectionRegistry(maxsize=2)
+    coll1 = dlite.Collection()
+    coll2 = dlite.Collection()
+    coll3 = dlite.Collection()
+    uuid1, uuid2, uuid3 = coll1.uuid, coll2.uuid, coll3.uuid
+
+    registry.add(coll1, 1)
+    registry.add(coll2, 1)
+    assert registry.get(uuid1, 1) is coll1  # coll1 is now most recent
+    registry.add(coll3, 1)
+
+    # Collections referred to elsewhere stay registered
+    assert len(registry) == 3
+    assert uuid2 in registry
+
+    # The least recently used collection is not kept alive
+    del coll1, coll2, coll3
+    gc.collect()
+    assert len(registry) == 2
+    assert uuid1 in registry
+    assert uuid2 not in registry
+    assert uuid3 in registry
+    assert registry.get(uuid2, 1) is None
+
+
+def test_registry_stale_generation() -> None:
+    """Test that stale collections are dropped from the registry."""
+    import dlite
+
+    from oteapi_dlite.utils.registry import CollectionRegistry
+
+    registry = CollectionRegistry()
+    coll = dlite.Collection()
+    registry.add(coll, 3)
+
+    assert registry.generation(coll.uuid) == 3
+    assert registry.get(coll.uuid, 4) is None
+    assert coll.uuid not in registry
+
+
+def test_get_collection_from_registry() -> None:
+    """Test that get_collection() returns the live collection and falls back
+    to the data cache when the collection is stale."""
+    from oteapi.datacache import DataCache
+
+    from oteapi_dlite.utils import get_collection, update_collection
+    from oteapi_dlite.utils.delta import CollectionLog, log_key
+    from oteapi_dlite.utils.registry import COLLECTION_REGISTRY
+
+    coll = get_collection()
+    coll.add_relation("s", "p", "o")
+    update_collection(coll)
+    assert get_collection(coll.uuid) is coll
+
+    # Simulate an update from another interpreter
+    cache = DataCache()
+    key = log_key(coll.uuid)
+    log = CollectionLog.from_dict(cache.get(key))
+    log.generation += 1
+    cache.add(log.asdict(), key=key)
+
+    coll2 = get_collection(coll.uuid)
+    assert coll2 is not coll
+    assert coll2.uuid == coll.uuid
+    assert ("s", "p", "o") in set(coll2.get_relations())
+    assert COLLECTION_REGISTRY.generation(coll.uuid) == log.generation
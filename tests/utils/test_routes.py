@@ -0,0 +1,139 @@
+"""Tests for oteapi_dlite.utils.routes."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ..conftest import PathsTuple
+
+
+def make_collection(energy: float):
+    """Return a collection with Energy and Forces instances and mappings
+    to the Result datamodel.
+
+    Plain IRIs are used for the ontological concepts and only FnO
+    function mappers are used in the tests, such that no ontology needs
+    to be fetched.
+    """
+    import dlite
+    from tripper import MAP, Triplestore
+
+    Energy = dlite.get_instance("http://onto-ns.com/meta/0.1/Energy")
+    Forces = dlite.get_instance("http://onto-ns.com/meta/0.1/Forces")
+    energy_inst = Energy()
+    energy_inst.energy = energy  # eV
+    forces_inst = Forces(dimensions={"natoms": 2, "ncoords": 3})
+    forces_inst.forces = [(0.0, 0.0, energy), (0.0, 0.0, -energy)]  # eV/Å
+
+    coll = dlite.Collection()
+    coll.add("energy", energy_inst)
+    coll.add("forces", forces_inst)
+    ts = Triplestore(backend="collection", collection=coll)
+    ts.add_triples(
+        [
+            (
+                "http://onto-ns.com/meta/0.1/Energy#energy",
+                MAP.mapsTo,
+                "https://w3id.org/emmo#PotentialEnergy",
+            ),
+            (
+                "http://onto-ns.com/meta/0.1/Forces#forces",
+                MAP.mapsTo,
+                "https://w3id.org/emmo#Force",
+            ),
+            (
+                "http://onto-ns.com/meta/0.1/Result#forces",
+                MAP.mapsTo,
+                "https://w3id.org/emmo#Force",
+            ),
+            (
+                "http://onto-ns.com/meta/0.1/Result#potential_energy",
+                MAP.mapsTo,
+                "https://w3id.org/emmo#PotentialEnergy",
+            ),
+        ]
+    )
+    return coll
+
+
+def test_get_instance_cached_plan(paths: PathsTuple) -> None:
+    """Test that get_instance() reuses the mapping plan for new values."""
+    import dlite
+    import numpy as np
+
+    from oteapi_dlite.utils import get_instance
+    from oteapi_dlite.utils.routes import PLAN_CACHE, mapping_hash
+
+    dlite.storage_path.append(str(paths.entitydir / "*.json"))
+
+    PLAN_CACHE.clear()
+    coll1 = make_collection(2.1)
+    coll2 = make_collection(1.0)
+    assert mapping_hash(coll1) == mapping_hash(coll2)
+
+    kwargs = {
+        "meta": "http://onto-ns.com/meta/0.1/Result",
+        "function_mappers": "fno",
+    }
+    inst1 = get_instance(collection=coll1, **kwargs)
+    assert len(PLAN_CACHE) == 1
+    inst2 = get_instance(collection=coll2, **kwargs)
+    assert len(PLAN_CACHE) == 1
+
+    assert np.allclose(inst1.potential_energy, 3.36457e-19)  # Joule
+    assert np.allclose(inst2.potential_energy, 1.602177e-19)  # Joule
+    assert np.allclose(inst2.forces[0], [0, 0, 1.602177e-09])  # Newton
+
+    # New mappings give a new plan
+    coll2.add_relation("a", "http://example.com/b", "c")
+    get_instance(collection=coll2, **kwargs)
+    assert len(PLAN_CACHE) == 2
+
+
+def test_get_instances(paths: PathsTuple) -> None:
+    """Test batch instantiation with get_instances()."""
+    import dlite
+    import numpy as np
+    import pytest
+
+    from oteapi_dlite.utils import get_instance, get_instances
+
+    dlite.storage_path.append(str(paths.entitydir / "*.json"))
+
+    Energy = dlite.get_instance("http://onto-ns.com/meta/0.1/Energy")
+    Forces = dlite.get_instance("http://onto-ns.com/meta/0.1/Forces")
+    energies = [2.1, 1.0, 0.5]
+    coll = make_collection(energies[0])
+    for i, energy in enumerate(energies[1:], start=1):
+        energy_inst = Energy()
+        energy_inst.energy = energy
+        forces_inst = Forces(dimensions={"natoms": 2, "ncoords": 3})
+        forces_inst.forces = [(0.0, 0.0, energy), (0.0, 0.0, -energy)]
+        coll.add(f"energy{i}", energy_inst)
+        coll.add(f"forces{i}", forces_inst)
+
+    # Unrelated datamodels may have any number of instances
+    Image = dlite.get_instance("http://onto-ns.com/meta/1.0/Image")
+    coll.add("image1", Image([2, 2, 1]))
+    coll.add("image2", Image([2, 2, 1]))
+
+    kwargs = {
+        "meta": "http://onto-ns.com/meta/0.1/Result",
+        "function_mappers": "fno",
+    }
+    insts = get_instances(
+        collection=coll,
+        instance_ids=[f"result{i}" for i in range(len(energies))],
+        **kwargs,
+    )
+    assert [inst.uri for inst in insts] == ["result0", "result1", "result2"]
+    for inst, energy in zip(insts, energies, strict=True):
+        expected = get_instance(collection=make_collection(energy), **kwargs)
+        assert np.allclose(inst.potential_energy, expected.potential_energy)
+        assert np.allclose(inst.forces, expected.forces)
+
+    # Inconsistent number of source instances
+    coll.remove("forces2")
+    with pytest.raises(ValueError, match="inconsistent number"):
+        get_instances(collection=coll, **kwargs)
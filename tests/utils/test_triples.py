@@ -0,0 +1,48 @@
+"""Tests for oteapi_dlite.utils.triples."""
+
+from __future__ import annotations
+
+
+def test_prefix_expander() -> None:
+    """Test that PrefixExpander agrees with expanding each term with
+    Triplestore.expand_iri()."""
+    from tripper import Literal, Triplestore
+
+    from oteapi_dlite.utils.triples import PrefixExpander
+
+    ts = Triplestore(backend="collection")
+    ts.bind("ex", "http://example.com/onto#")
+    ts.bind("map", "http://emmo.info/domain-mappings#")
+    for i in range(5):
+        ts.bind(f"m{i}", f"http://onto-ns.com/meta/0.1/Model{i}#")
+
+    triples = [
+        (f"m{i % 5}:prop{i % 1000}", "map:mapsTo", f"ex:Concept{i % 100}")
+        for i in range(5000)
+    ]
+    triples.append(("http://example.com/a", "ex:b", "undefined:c"))
+    triples.append(("ex:d", "ex:e", Literal(1)))
+
+    expected = tuple(
+        dict.fromkeys(
+            tuple(
+                ts.expand_iri(term) if isinstance(term, str) else term
+                for term in triple
+            )
+            for triple in triples
+        )
+    )
+    expanded = PrefixExpander(ts.namespaces).expand_triples(triples)
+    assert expanded == expected
+    assert len(expanded) == 1002
+    assert expanded[0] == (
+        "http://onto-ns.com/meta/0.1/Model0#prop0",
+        "http://emmo.info/domain-mappings#mapsTo",
+        "http://example.com/onto#Concept0",
+    )
+    assert expanded[-2] == (
+        "http://example.com/a",
+        "http://example.com/onto#b",
+        "undefined:c",
+    )
+    assert expanded[-1][2] == Literal(1)
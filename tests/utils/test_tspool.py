@@ -0,0 +1,111 @@
+"""Tests for oteapi_dlite.utils.tspool."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_triplestore_pool(tmp_path: Path) -> None:
+    """Test reuse, flush and idle eviction of pooled triplestores."""
+    import os
+    import time
+
+    from tripper import RDF, Triplestore
+
+    from oteapi_dlite.utils import (
+        acquire_triplestore,
+        get_triplestore,
+        release_triplestore,
+    )
+    from oteapi_dlite.utils.tspool import TRIPLESTORE_POOL
+
+    kb = tmp_path / "kb.ttl"
+    ts = Triplestore(backend="rdflib")
+    ts.add(("http://ex.com#a", RDF.type, "http://ex.com#A"))
+    ts.serialize(kb)
+    ts.close()
+
+    # get_triplestore() returns a new triplestore owned by the caller
+    TRIPLESTORE_POOL.clear()
+    ts = get_triplestore({"backend": "rdflib", "triplestore_url": str(kb)})
+    assert len(TRIPLESTORE_POOL) == 0
+    ts.close()
+
+    ts1 = acquire_triplestore({"backend": "rdflib", "triplestore_url": str(kb)})
+    ts1.add(("http://ex.com#b", RDF.type, "http://ex.com#B"))
+    release_triplestore(ts1, dirty=True)
+    assert len(TRIPLESTORE_POOL) == 1
+
+    # The content is flushed to the knowledge base on a dirty release
+    assert "http://ex.com#b" in kb.read_text()
+
+    # Normalised settings give the already loaded triplestore, which is
+    # not written back on a clean release
+    mtime = kb.stat().st_mtime_ns
+    ts2 = acquire_triplestore({"triplestore_url": str(kb), "backend": "rdflib"})
+    assert ts2 is ts1
+    assert not ts2.closed
+    release_triplestore(ts2)
+    assert kb.stat().st_mtime_ns == mtime
+
+    def modify(name: str, offset: int) -> None:
+        """Add a triple to the knowledge base, like another process."""
+        ts = Triplestore(backend="rdflib", triplestore_url=str(kb))
+        ts.add((f"http://ex.com#{name}", RDF.type, "http://ex.com#C"))
+        ts.serialize(kb)
+        ts.close()
+        os.utime(kb, ns=(mtime + offset, mtime + offset))
+
+    # Changes by other processes are merged before the file is overwritten
+    ts2 = acquire_triplestore({"backend": "rdflib", "triplestore_url": str(kb)})
+    assert ts2 is ts1
+    ts2.add(("http://ex.com#c", RDF.type, "http://ex.com#C"))
+    modify("d", 10**9)
+    release_triplestore(ts2, dirty=True)
+    text = kb.read_text()
+    assert all(f"http://ex.com#{name}" in text for name in "abcd")
+
+    # A pooled triplestore is reloaded if the file has been modified
+    modify("e", 2 * 10**9)
+    ts2 = acquire_triplestore({"backend": "rdflib", "triplestore_url": str(kb)})
+    assert ts2 is not ts1
+    assert ts1.closed
+    assert "http://ex.com#e" in {s for s, _, _ in ts2.triples()}
+    release_triplestore(ts2)
+
+    # Closing the stale triplestore does not overwrite the file, so the
+    # reloaded triplestore is reused
+    assert "http://ex.com#e" in kb.read_text()
+    ts1 = acquire_triplestore({"backend": "rdflib", "triplestore_url": str(kb)})
+    assert ts1 is ts2
+    release_triplestore(ts1)
+
+    # Idle triplestores are closed and evicted without overwriting the
+    # file
+    modify("f", 3 * 10**9)
+    TRIPLESTORE_POOL.evict_idle(now=time.monotonic() + 1e6)
+    assert len(TRIPLESTORE_POOL) == 0
+    assert ts1.closed
+    assert "http://ex.com#f" in kb.read_text()
+
+    ts3 = acquire_triplestore({"backend": "rdflib", "triplestore_url": str(kb)})
+    assert ts3 is not ts1
+    assert ts3.value(predicate=RDF.type, object="http://ex.com#B")
+    release_triplestore(ts3)
+
+    # Idle triplestores are also evicted on release
+    TRIPLESTORE_POOL.max_idle = -1.0
+    try:
+        ts4 = acquire_triplestore(
+            {"backend": "rdflib", "triplestore_url": str(kb)}
+        )
+        assert ts3.closed
+        release_triplestore(ts4)
+        assert len(TRIPLESTORE_POOL) == 0
+        assert ts4.closed
+    finally:
+        TRIPLESTORE_POOL.max_idle = 600.0
+    TRIPLESTORE_POOL.clear()
@@ -33,3 +33,21 @@ def test_update_dict():
     # Do not accept conversion between other types
     with pytest.raises(TypeMismatchError):
         update_dict(dct.copy(), {"a": "abc..."})
+
+
+def test_get_instance_index():
+    """Test that get_instance_index() does not load any instances."""
+    import dlite
+
+    from oteapi_dlite.utils import get_instance_index
+
+    # Relations referring to an instance that does not exist
+    uuid = "6b4c4f4e-0000-4000-8000-000000000001"
+    coll = dlite.Collection()
+    coll.add_relation("inst", "_is-a", "Instance")
+    coll.add_relation("inst", "_has-uuid", uuid, "xsd:anyURI")
+    coll.add_relation("inst", "_has-meta", "http://onto-ns.com/meta/0.1/A")
+
+    assert get_instance_index(coll) == {
+        "inst": (uuid, "http://onto-ns.com/meta/0.1/A"),
+    }